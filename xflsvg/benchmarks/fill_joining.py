@@ -0,0 +1,236 @@
+"""
+Benchmark joining fill segments into shapes with point_lists_to_shapes.
+
+Compares:
+    recursive - the recursive point_lists_to_shapes that xflsvg used to have
+    current - the current point_lists_to_shapes, which walks each point list
+        once
+
+Shapes come from two places:
+    * The DOMShapes with the most edges in the XFL files given on the command
+      line (directories or .fla files)
+    * Synthetic stress shapes: one long ring, a checkerboard where shapes of
+      the same fill touch at their corners, and many small rings
+
+Usage:
+    python fill_joining.py [--top N] [--repeat N] [xfl ...]
+"""
+
+import argparse
+from collections import Counter, defaultdict
+import math
+import os
+import sys
+import time
+import xml.etree.ElementTree as etree
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from xflsvg.domshape.edge import (
+    edge_format_to_point_lists,
+    point_lists_to_shapes,
+    xfl_edge_attributes,
+)
+from xflsvg.files import open_xfl
+
+
+def point_lists_to_shapes_recursive(point_lists):
+    """The recursive point_lists_to_shapes xflsvg used before it used a stack."""
+    graph = defaultdict(lambda: defaultdict(list))
+    shapes = defaultdict(list)
+
+    for point_list, fill_id in point_lists:
+        if point_list[0] == point_list[-1]:
+            shapes[fill_id].append(point_list)
+        else:
+            graph[fill_id][point_list[0]].append(point_list)
+
+    def walk(curr_point, used_points, origin, fill_graph):
+        for i in range(len(fill_graph[curr_point])):
+            next_point_list = fill_graph[curr_point][i]
+            next_point = next_point_list[-1]
+
+            if next_point == origin:
+                del fill_graph[curr_point][i]
+                return next_point_list
+            elif next_point not in used_points:
+                used_points.add(next_point)
+                shape = walk(next_point, used_points, origin, fill_graph)
+                if shape is None:
+                    used_points.remove(next_point)
+                else:
+                    del fill_graph[curr_point][i]
+                    return next_point_list + shape[1:]
+
+    for fill_id, fill_graph in graph.items():
+        for origin in fill_graph.keys():
+            while fill_graph[origin]:
+                point_list = fill_graph[origin].pop()
+                curr_point = point_list[-1]
+
+                shape = walk(curr_point, {origin, curr_point}, origin, fill_graph)
+                assert shape is not None, "Failed to build shape"
+
+                shapes[fill_id].append(point_list + shape[1:])
+
+    return shapes
+
+
+def fill_point_lists(edges):
+    """Get the input of point_lists_to_shapes from xfl_edge_attributes()."""
+    result = []
+    for edge_format, fill_id_left, fill_id_right, _ in edges:
+        for point_list in edge_format_to_point_lists(edge_format):
+            if fill_id_left is not None:
+                result.append((point_list, fill_id_left))
+            if fill_id_right is not None:
+                result.append((list(reversed(point_list)), fill_id_right))
+    return result
+
+
+def heaviest_shapes(paths, top):
+    """Get the edges of the DOMShapes with the most edges in XFL files."""
+    shapes = []
+    for path in paths:
+        files = open_xfl(path)
+        for name in files.names():
+            if not name.endswith(".xml"):
+                continue
+            xmlnode = etree.fromstring(files.read(name))
+            for domshape in xmlnode.iterfind(".//{*}DOMShape"):
+                edges_element = domshape.find("{*}edges")
+                if edges_element is not None:
+                    shapes.append(xfl_edge_attributes(edges_element))
+
+    shapes.sort(key=len, reverse=True)
+    return shapes[:top]
+
+
+def ring(segment_count, radius=20000):
+    """One shape whose outline is split into many segments."""
+    points = []
+    for i in range(segment_count):
+        angle = 2 * math.pi * i / segment_count
+        x = round(radius * math.cos(angle))
+        y = round(radius * math.sin(angle))
+        points.append(f"{x} {y}")
+    return tuple(
+        (f"!{points[i]}|{points[(i + 1) % segment_count]}", "1", None, None)
+        for i in range(segment_count)
+    )
+
+
+def checkerboard(size, cell=200):
+    """Cells of two fills. Cells of the same fill touch at their corners."""
+    edges = []
+    for row in range(size + 1):
+        for col in range(size + 1):
+            x = col * cell
+            y = row * cell
+            # The cell at (row, col) has fill "1" if row + col is even
+            before = "1" if (row + col) % 2 else "2"
+            after = "2" if (row + col) % 2 else "1"
+
+            # Segment between cells (row - 1, col) and (row, col)
+            if col < size:
+                edges.append(
+                    (
+                        f"!{x} {y}|{x + cell} {y}",
+                        before if row > 0 else None,
+                        after if row < size else None,
+                        None,
+                    )
+                )
+            # Segment between cells (row, col - 1) and (row, col)
+            if row < size:
+                edges.append(
+                    (
+                        f"!{x} {y}|{x} {y + cell}",
+                        after if col < size else None,
+                        before if col > 0 else None,
+                        None,
+                    )
+                )
+    return tuple(edges)
+
+
+def small_rings(count):
+    """Many separate triangles of the same fill."""
+    edges = []
+    for i in range(count):
+        x = (i % 100) * 300
+        y = (i // 100) * 300
+        edges.append((f"!{x} {y}|{x + 200} {y}", "1", None, None))
+        edges.append((f"!{x + 200} {y}|{x} {y + 200}", "1", None, None))
+        edges.append((f"!{x} {y + 200}|{x} {y}", "1", None, None))
+    return tuple(edges)
+
+
+def is_closed(shapes):
+    return all(shape[0] == shape[-1] for shape in shapes)
+
+
+def segments(shapes):
+    """Count the (fill style ID, point, next point) pairs of every shape."""
+    return Counter(
+        (fill_id, point, next_point)
+        for fill_id, fill_shapes in shapes.items()
+        for shape in fill_shapes
+        for point, next_point in zip(shape, shape[1:])
+    )
+
+
+def measure(method, point_lists, repeat):
+    """Return (seconds per call, result), or (None, None) on overflow."""
+    start = time.perf_counter()
+    try:
+        for _ in range(repeat):
+            result = method(point_lists)
+    except RecursionError:
+        return None, None
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("xfl", nargs="*", help="XFL files to take shapes from")
+    args = parser.parse_args()
+
+    cases = [
+        (f"heaviest #{i + 1} ({len(edges)} edges)", edges)
+        for i, edges in enumerate(heaviest_shapes(args.xfl, args.top))
+    ]
+    cases += [
+        ("ring, 500 segments", ring(500)),
+        ("ring, 5000 segments", ring(5000)),
+        ("checkerboard, 20x20", checkerboard(20)),
+        ("small rings, 3000", small_rings(3000)),
+    ]
+
+    print(f"{'':>32}{'recursive':>12}{'current':>12}")
+    for name, edges in cases:
+        point_lists = fill_point_lists(edges)
+        row = f"{name:>32}"
+        results = []
+        for method in (point_lists_to_shapes_recursive, point_lists_to_shapes):
+            seconds, result = measure(method, point_lists, args.repeat)
+            if seconds is None:
+                row += f"{'overflow':>12}"
+            else:
+                row += f"{seconds * 1000:>10.2f}ms"
+                results.append(result)
+
+        # Both versions must fill the same area. Shapes that touch at a point
+        # can be joined in a different order, so compare their segments.
+        if len(results) == 2:
+            assert all(map(is_closed, results[1].values())), f"Open shape in {name}"
+            assert segments(results[0]) == segments(results[1]), f"Different {name}"
+            if results[0] != results[1]:
+                row += "  (joined in a different order)"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark XFL ingestion on a large synthetic library.
+
+Each measurement runs in a fresh subprocess so that peak RSS is not polluted by
+earlier runs. Peak RSS comes from getrusage, so this only works on POSIX.
+
+Usage:
+    python parse_library.py [--symbols N] [--frames N] [--keep DIR]
+
+Modes:
+    soup - BeautifulSoup(..., "xml") on every file (the old ingestion parser)
+    etree - ElementTree on every file (the current ingestion parser)
+    reader - XflReader loading every LIBRARY asset
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+MODES = ("soup", "etree", "reader")
+
+
+def _xml_paths(xfl_dir):
+    return [os.path.join(xfl_dir, "DOMDocument.xml")] + sorted(
+        glob.glob(os.path.join(xfl_dir, "LIBRARY", "*.xml"))
+    )
+
+
+def _run_soup(xfl_dir):
+    from bs4 import BeautifulSoup
+
+    documents = []
+    for path in _xml_paths(xfl_dir):
+        with open(path) as xml_file:
+            documents.append(BeautifulSoup(xml_file, "xml"))
+    return documents
+
+
+def _run_etree(xfl_dir):
+    import xml.etree.ElementTree as etree
+
+    return [etree.parse(path).getroot() for path in _xml_paths(xfl_dir)]
+
+
+def _run_reader(xfl_dir):
+    from xflsvg import XflReader
+
+    reader = XflReader(xfl_dir)
+    for path in _xml_paths(xfl_dir)[1:]:
+        safe_asset_id = os.path.splitext(os.path.basename(path))[0]
+        reader.get_safe_asset(safe_asset_id)
+    return reader
+
+
+def measure(mode, xfl_dir):
+    """Run one mode in this process and return its timing and peak RSS."""
+    warnings.simplefilter("ignore")
+    run = globals()[f"_run_{mode}"]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run(xfl_dir)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    del result
+    return {"mode": mode, "seconds": elapsed, "peak_rss_mb": peak_kb / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--keep", help="Write the synthetic library here")
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("xfl_dir", nargs="?", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.xfl_dir)))
+        return
+
+    from synthetic import generate_xfl
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xfl_dir = args.keep or os.path.join(tmp_dir, "synthetic")
+        generate_xfl(xfl_dir, symbol_count=args.symbols, frame_count=args.frames)
+        size_mb = sum(os.path.getsize(p) for p in _xml_paths(xfl_dir)) / 2**20
+        print(f"{args.symbols} symbols, {size_mb:.1f} MB of XML")
+
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", mode, xfl_dir],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{mode:>8}: {result['seconds']:8.2f} s"
+                f"  peak RSS {result['peak_rss_mb']:8.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
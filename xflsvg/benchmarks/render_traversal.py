@@ -0,0 +1,189 @@
+"""
+Benchmark Frame.render's traversal on deep synthetic frame trees.
+
+Compares three ways of rendering the same tree:
+    recursive - the recursive Frame.render that xflsvg used to have
+    render - the current Frame.render, which walks the tree with a stack
+    replay - replaying a cached RenderProgram from Frame.compile()
+
+The trees are built directly from Frame, ShapeFrame and MaskedFrame, so only
+the traversal is measured. Shapes are never converted.
+
+Usage:
+    python render_traversal.py [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+warnings.simplefilter("ignore")
+
+from xflsvg.xflsvg import Frame, MaskedFrame, ShapeFrame, XflRenderer
+
+_MATRIX = (0.5, 0.0, 0.0, 0.5, 10.0, 10.0)
+
+
+class CountingRenderer(XflRenderer):
+    """Records every hook call and does nothing else."""
+
+    def __init__(self):
+        self.calls = []
+
+    def render_shape(self, frame, *args, **kwargs):
+        self.calls.append(("render_shape", frame.identifier))
+
+    def push_transform(self, frame, *args, **kwargs):
+        self.calls.append(("push_transform", frame.identifier))
+
+    def pop_transform(self, frame, *args, **kwargs):
+        self.calls.append(("pop_transform", frame.identifier))
+
+    def push_mask(self, frame, *args, **kwargs):
+        self.calls.append(("push_mask", frame.identifier))
+
+    def pop_mask(self, frame, *args, **kwargs):
+        self.calls.append(("pop_mask", frame.identifier))
+
+    def push_masked_render(self, frame, *args, **kwargs):
+        self.calls.append(("push_masked_render", frame.identifier))
+
+    def pop_masked_render(self, frame, *args, **kwargs):
+        self.calls.append(("pop_masked_render", frame.identifier))
+
+    def on_frame_rendered(self, frame, *args, **kwargs):
+        self.calls.append(("on_frame_rendered", frame.identifier))
+
+
+def render_recursive(frame, *args, **kwargs):
+    """The recursive traversal Frame.render used before it used a stack."""
+    renderer = XflRenderer.current()
+
+    if isinstance(frame, ShapeFrame):
+        renderer.render_shape(frame, *args, **kwargs)
+
+    elif isinstance(frame, MaskedFrame):
+        renderer.push_mask(frame, *args, **kwargs)
+        render_recursive(frame.mask)
+        renderer.pop_mask(frame, *args, **kwargs)
+
+        renderer.push_masked_render(frame, *args, **kwargs)
+        for child in frame.children:
+            render_recursive(child)
+        renderer.pop_masked_render(frame, *args, **kwargs)
+
+    else:
+        renderer.push_transform(frame, *args, **kwargs)
+        for child in frame.children:
+            render_recursive(child, *args, **kwargs)
+        renderer.pop_transform(frame, *args, **kwargs)
+
+    renderer.on_frame_rendered(frame, *args, **kwargs)
+
+
+def symbol_chain(depth):
+    """A chain of nested symbols with a shape at the bottom."""
+    frame = ShapeFrame(None)
+    for _ in range(depth):
+        parent = Frame(_MATRIX)
+        parent.add_child(frame)
+        frame = parent
+    return frame
+
+
+def masked_chain(depth):
+    """A chain of symbols where every fourth level is a masked layer."""
+    frame = ShapeFrame(None)
+    for level in range(depth):
+        if level % 4 == 3:
+            parent = MaskedFrame(ShapeFrame(None))
+        else:
+            parent = Frame(_MATRIX)
+        parent.add_child(frame)
+        frame = parent
+    return frame
+
+
+def symbol_tree(depth, branching):
+    """A complete tree of symbols with shapes at the leaves."""
+    if depth == 0:
+        return ShapeFrame(None)
+
+    frame = Frame(_MATRIX)
+    for _ in range(branching):
+        frame.add_child(symbol_tree(depth - 1, branching))
+    return frame
+
+
+def measure(method, frame, repeat):
+    """Return the seconds per render, or None if Python ran out of stack."""
+    if method == "replay":
+        frame.compile()
+
+    start = time.perf_counter()
+    try:
+        for _ in range(repeat):
+            with CountingRenderer():
+                if method == "recursive":
+                    render_recursive(frame)
+                elif method == "render":
+                    frame.render()
+                else:
+                    frame.compile().replay()
+    except RecursionError:
+        return None
+
+    return (time.perf_counter() - start) / repeat
+
+
+def check_calls(frame):
+    """Make sure every method makes the same renderer calls."""
+    results = []
+    for method in ("recursive", "render", "replay"):
+        with CountingRenderer() as renderer:
+            if method == "recursive":
+                render_recursive(frame)
+            elif method == "render":
+                frame.render()
+            else:
+                frame.compile().replay()
+        results.append(renderer.calls)
+
+    assert results[0] == results[1] == results[2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    check_calls(masked_chain(40))
+    check_calls(symbol_tree(4, 3))
+
+    cases = [
+        ("symbol chain, depth 100", symbol_chain(100)),
+        ("symbol chain, depth 400", symbol_chain(400)),
+        ("symbol chain, depth 5000", symbol_chain(5000)),
+        ("masked chain, depth 400", masked_chain(400)),
+        ("masked chain, depth 5000", masked_chain(5000)),
+        ("symbol tree, depth 10, branching 2", symbol_tree(10, 2)),
+        ("symbol tree, depth 4, branching 8", symbol_tree(4, 8)),
+    ]
+
+    print(f"{'':>36}{'recursive':>12}{'render':>12}{'replay':>12}")
+    for name, frame in cases:
+        row = f"{name:>36}"
+        for method in ("recursive", "render", "replay"):
+            seconds = measure(method, frame, args.repeat)
+            if seconds is None:
+                row += f"{'overflow':>12}"
+            else:
+                row += f"{seconds * 1000:>10.2f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Generate synthetic XFL directories for benchmarking.
+
+The generated files only use the subset of XFL that xflsvg understands: symbol
+instances, shapes with solid and gradient fills, strokes, groups, and mask
+layers. Symbols only reference symbols with a higher index, so the library is
+always acyclic.
+"""
+
+import os
+import random
+
+XFL_NAMESPACES = (
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xmlns="http://ns.adobe.com/xfl/2008/"'
+)
+
+
+def _matrix(rng):
+    a = rng.choice(["1", "0.5", "0.987335205078125"])
+    tx = rng.randint(-50, 50)
+    ty = rng.randint(-50, 50)
+    return f'<matrix><Matrix a="{a}" d="0.75" tx="{tx}.5" ty="{ty}"/></matrix>'
+
+
+def _color(rng):
+    return rng.choice(
+        [
+            "",
+            '<color><Color alphaMultiplier="0.5"/></color>',
+            '<color><Color brightness="-0.3"/></color>',
+            '<color><Color tintMultiplier="0.4" tintColor="#336699"/></color>',
+        ]
+    )
+
+
+def _shape(rng, edge_count):
+    x = rng.randint(0, 4000)
+    y = rng.randint(0, 4000)
+    size = rng.randint(100, 2000)
+    color = rng.randint(0, 0xFFFFFF)
+
+    fills = (
+        "<fills>"
+        f'<FillStyle index="1"><SolidColor color="#{color:06X}" alpha="0.5"/></FillStyle>'
+        '<FillStyle index="2"><LinearGradient spreadMethod="reflect">'
+        f'<matrix><Matrix a="0.05" d="0.05" tx="{x / 20}" ty="{y / 20}"/></matrix>'
+        '<GradientEntry color="#FF0000" ratio="0"/>'
+        '<GradientEntry color="#00FF00" alpha="0.5" ratio="1"/>'
+        "</LinearGradient></FillStyle>"
+        "</fills>"
+    )
+    strokes = (
+        '<strokes><StrokeStyle index="1">'
+        '<SolidStroke scaleMode="normal" weight="2.5" caps="none">'
+        '<fill><SolidColor color="#112233"/></fill>'
+        "</SolidStroke></StrokeStyle></strokes>"
+    )
+
+    # A zig-zag outline closed by a quadratic curve, split across two <Edge>s
+    # so the segments have to be joined.
+    step = max(1, size // edge_count)
+    top = [f"{x + i * step} {y + (i % 2) * 40}" for i in range(1, edge_count)]
+    right = x + edge_count * step
+    first = (
+        f"!{x} {y}|"
+        + "|".join(top)
+        + f"|{right} {y}[{right + step} {y + size // 2} {right} {y + size}"
+    )
+    second = f"!{right} {y + size}/#{x:X}.80 {y + size}S2|{x} {y}"
+    hole = (
+        f"!{x + step} {y + size // 4}|{x + 2 * step}.5 {y + size // 4}"
+        f"|{x + 2 * step}.5 {y + size // 2}|{x + step} {y + size // 4}"
+    )
+    edges = (
+        "<edges>"
+        f'<Edge fillStyle0="1" strokeStyle="1" edges="{first}"/>'
+        f'<Edge fillStyle0="1" edges="{second}"/>'
+        f'<Edge fillStyle1="2" edges="{hole}"/>'
+        '<Edge cubics="!0 0(;1,1 2,2 3,3);"/>'
+        "</edges>"
+    )
+    return f"<DOMShape>{fills}{strokes}{edges}</DOMShape>"
+
+
+def _elements(rng, dependencies, edge_count, depth=0):
+    result = []
+    for _ in range(rng.randint(1, 3)):
+        kind = rng.random()
+        if kind < 0.45 or (kind < 0.8 and not dependencies) or depth >= 2:
+            result.append(_shape(rng, edge_count))
+        elif kind < 0.8:
+            name = rng.choice(dependencies)
+            loop = rng.choice(["loop", "play once", "single frame"])
+            first_frame = rng.randint(0, 3)
+            result.append(
+                f'<DOMSymbolInstance libraryItemName="{name}" loop="{loop}" '
+                f'firstFrame="{first_frame}">{_matrix(rng)}{_color(rng)}'
+                "</DOMSymbolInstance>"
+            )
+        else:
+            members = "".join(_elements(rng, dependencies, edge_count, depth + 1))
+            result.append(
+                f"<DOMGroup>{_matrix(rng)}<members>{members}</members></DOMGroup>"
+            )
+    return result
+
+
+def _layers(rng, dependencies, layer_count, frame_count, max_duration, edge_count):
+    result = []
+    for layer_index in range(layer_count):
+        attributes = ""
+        if layer_count > 2 and layer_index == 0:
+            attributes = ' layerType="mask"'
+        elif layer_count > 2 and layer_index == 1:
+            attributes = ' parentLayerIndex="0"'
+
+        frames = []
+        frame_index = 0
+        while frame_index < frame_count:
+            duration = rng.randint(1, max_duration)
+            if rng.random() < 0.15:
+                elements = ""
+            else:
+                elements = "".join(_elements(rng, dependencies, edge_count))
+            frames.append(
+                f'<DOMFrame index="{frame_index}" duration="{duration}" keyMode="9728">'
+                f"<elements>{elements}</elements></DOMFrame>"
+            )
+            frame_index += duration
+
+        result.append(
+            f'<DOMLayer name="Layer {layer_index}"{attributes} color="#4FFF4F">'
+            f'<frames>{"".join(frames)}</frames></DOMLayer>'
+        )
+    return "".join(result)
+
+
+def generate_xfl(
+    output_dir,
+    symbol_count=30,
+    frame_count=40,
+    edge_count=8,
+    nesting=4,
+    seed=0,
+):
+    """Write a synthetic XFL directory to output_dir.
+
+    Args:
+        symbol_count: Number of LIBRARY/*.xml files
+        frame_count: Length of the document timeline
+        edge_count: Approximate number of line segments per shape
+        nesting: Maximum depth of symbol chains
+        seed: Random seed, so repeated runs produce the same files
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(output_dir, "LIBRARY"), exist_ok=True)
+
+    names = [f"Symbol {i}" for i in range(symbol_count)]
+    for i in reversed(range(symbol_count)):
+        dependencies = names[i + 1 : i + 3] if i % nesting != nesting - 1 else []
+        layers = _layers(
+            rng, dependencies, rng.randint(1, 4), rng.randint(1, 12), 4, edge_count
+        )
+        with open(os.path.join(output_dir, "LIBRARY", f"{names[i]}.xml"), "w") as f:
+            f.write(
+                f'<DOMSymbolItem {XFL_NAMESPACES} name="{names[i]}"><timeline>'
+                f'<DOMTimeline name="{names[i]}"><layers>{layers}</layers>'
+                "</DOMTimeline></timeline></DOMSymbolItem>"
+            )
+
+    layers = _layers(rng, names[:8], 4, frame_count, 6, edge_count)
+    with open(os.path.join(output_dir, "DOMDocument.xml"), "w") as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<DOMDocument {XFL_NAMESPACES} width="864" height="486"><timelines>'
+            f'<DOMTimeline name="Scene 1"><layers>{layers}</layers></DOMTimeline>'
+            "</timelines></DOMDocument>"
+        )
+
+    return output_dir
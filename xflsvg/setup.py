@@ -77,7 +77,7 @@ SOFTWARE.
 ''',
     packages=['xflsvg', 'xflsvg.domshape'],
     package_dir={'': 'src'},
-    install_requires=['bs4', 'html5lib', 'lxml', 'pandas', 'fastparquet'],
+    install_requires=['bs4', 'html5lib', 'lxml', 'numpy', 'pandas', 'fastparquet'],
     include_package_data=True,
 
     classifiers=[
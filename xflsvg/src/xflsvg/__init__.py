@@ -1,3 +1,8 @@
 from .xflsvg import XflReader
 from .xflsvg import Frame
+from .xflsvg import compile_xfl
+from .cache import ShapeContentCache
+from .transforms import get_world_transforms
+from .flatten import flatten_frame
+from .tensors import frame_to_tensors, export_tensor_shards
 from .renderer import SvgRenderer
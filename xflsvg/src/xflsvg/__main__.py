@@ -0,0 +1,64 @@
+import argparse
+
+from .tensors import export_tensor_shards
+from .xflsvg import XflReader, compile_xfl
+
+
+def compile_command(args):
+    compile_xfl(args.input, args.output, workers=args.workers)
+
+
+def tensors_command(args):
+    reader = XflReader(args.input)
+    timeline = reader.get_timeline(args.timeline or 0)
+    export_tensor_shards(
+        timeline,
+        args.output,
+        frames_per_shard=args.frames_per_shard,
+        max_segments=args.max_segments,
+        format=args.format,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Work with XFL files")
+    subparsers = parser.add_subparsers(title="commands", dest="command")
+
+    cmd_compile = subparsers.add_parser(
+        "compile",
+        help="Compile an XFL directory or FLA file into a single file",
+        description="Compile an XFL directory or FLA file into a single file. "
+        "Compiled files contain pickled data. Only open compiled files from "
+        "trusted sources: loading a malicious one can run arbitrary code.",
+    )
+    cmd_compile.add_argument("--input", type=str, metavar="folder|fla", required=True)
+    cmd_compile.add_argument("--output", type=str, metavar="file", required=True)
+    cmd_compile.add_argument("--workers", type=int, metavar="count")
+
+    cmd_tensors = subparsers.add_parser(
+        "tensors", help="Export a timeline as shards of Bezier curve tensors"
+    )
+    cmd_tensors.add_argument("--input", type=str, metavar="xfl", required=True)
+    cmd_tensors.add_argument("--output", type=str, metavar="folder", required=True)
+    cmd_tensors.add_argument("--timeline", type=str, metavar="name")
+    cmd_tensors.add_argument(
+        "--frames-per-shard", type=int, metavar="count", default=256
+    )
+    cmd_tensors.add_argument("--max-segments", type=int, metavar="count")
+    cmd_tensors.add_argument("--format", choices=("npy", "npz"), default="npy")
+
+    handlers = {
+        "compile": compile_command,
+        "tensors": tensors_command,
+    }
+
+    args = parser.parse_args()
+    if args.command not in handlers:
+        parser.print_help()
+        return
+
+    handlers[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Caches shared by the objects of an XflReader, and shape caches that can be
+shared by several readers.
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+
+from .domshape import xfl_domshape_to_svg, xfl_domshapes_to_svg
+
+# Bump this whenever the converted shape format or the shape converter's
+# output changes. Entries written by other versions are never read.
+CACHE_FORMAT_VERSION = 3
+
+# Every cache file starts with this header. It's checked before anything is
+# unpickled, so files from other versions or other programs are never loaded.
+_CACHE_FILE_HEADER = b"XFLSVGS" + struct.pack("<I", CACHE_FORMAT_VERSION)
+
+
+class LruCache:
+    """A mapping that evicts its least recently used entries.
+
+    One LruCache is shared by every frame and shape cache of an XflReader, so
+    max_entries bounds the reader's memory use no matter how long the rendered
+    timelines are. The hits, misses and evictions counters can be used to tune
+    max_entries.
+    """
+
+    def __init__(self, max_entries=None):
+        """
+        Args:
+            max_entries: Maximum number of entries to keep, or None for no
+                limit.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        if self.max_entries is None:
+            return
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def items(self):
+        """List the (key, value) pairs, least recently used first. Doesn't
+        count as using them."""
+        return list(self._entries.items())
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ShapeDiskCache:
+    """Converted shapes stored on disk, keyed by the content of their XFL file.
+
+    Entries are keyed by a hash of the XML file and CACHE_FORMAT_VERSION, so
+    edited files and library upgrades never see stale entries. Entries are
+    written atomically, so several processes can share one cache directory.
+
+    Entries are pickled, so only use cache directories that untrusted users
+    can't write to. Loading a malicious entry can run arbitrary code.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_key(self, xml_bytes, precision=None, relative=False):
+        digest = hashlib.blake2b(xml_bytes, digest_size=20)
+        digest.update(f"xflsvg-cache-{CACHE_FORMAT_VERSION}".encode())
+        digest.update(_path_format_tag(precision, relative))
+        return digest.hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pickle")
+
+    def load(self, key):
+        return _read_pickle(self._get_path(key))
+
+    def save(self, key, value):
+        _write_pickle(self._get_path(key), value)
+
+
+def _path_format_tag(precision, relative):
+    """Describe the path data format for cache keys. The default format is
+    empty, so its keys are the same as before the format was configurable."""
+    if precision is None and not relative:
+        return b""
+    return f"-path-{precision}-{relative}".encode()
+
+
+def _update_with_element(digest, element):
+    """Hash an XML element without depending on namespace prefixes or
+    attribute order."""
+    digest.update(element.tag.rpartition("}")[2].encode())
+    for name, value in sorted(element.attrib.items()):
+        digest.update(f"\0{name}={value}".encode())
+    digest.update(b"\1")
+    for child in element:
+        _update_with_element(digest, child)
+    digest.update(b"\2")
+
+
+def _read_pickle(path):
+    """Unpickle a file written by _write_pickle. Returns None if the file
+    doesn't exist or doesn't have the header of this CACHE_FORMAT_VERSION."""
+    try:
+        with open(path, "rb") as cache_file:
+            if cache_file.read(len(_CACHE_FILE_HEADER)) != _CACHE_FILE_HEADER:
+                return None
+            return pickle.load(cache_file)
+    except FileNotFoundError:
+        return None
+
+
+def _write_pickle(path, value):
+    """Pickle a value into a file atomically, after _CACHE_FILE_HEADER."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as output_file:
+            output_file.write(_CACHE_FILE_HEADER)
+            pickle.dump(value, output_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class ShapeContentCache:
+    """Converted shapes keyed by the content of their <DOMShape>.
+
+    The same shape content is often copied between symbols and documents.
+    Shapes are keyed by a hash of their fill styles, stroke styles and edges,
+    so one ShapeContentCache can be passed to any number of XflReaders, and
+    each distinct shape is only converted once. Normal and mask SVGs are
+    cached separately.
+
+    Converted shapes are shared by every frame that uses them, so they must not
+    be modified. Saved caches are pickled, so only load files from trusted
+    sources.
+    """
+
+    def __init__(self, path=None, max_entries=None):
+        """
+        Args:
+            path: Optional file to persist the cache to with save(). If it
+                exists, its entries are loaded.
+            max_entries: Maximum number of converted shapes to keep, or None
+                for no limit.
+        """
+        self.path = path
+        self.entries = LruCache(max_entries)
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def get_key(shape_record, mask, precision=None, relative=False):
+        """Hash a DOMShapeRecord and the conversion options."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"xflsvg-shape-{CACHE_FORMAT_VERSION}-{mask}".encode())
+        digest.update(_path_format_tag(precision, relative))
+        for styles in (shape_record.fill_styles, shape_record.stroke_styles):
+            digest.update(b"\3")
+            for index, style in styles:
+                digest.update(f"{index}".encode())
+                _update_with_element(digest, style)
+        digest.update(b"\3")
+        for edge in shape_record.edges:
+            digest.update(repr(edge).encode())
+        return digest.hexdigest()
+
+    def convert(
+        self, shape_record, mask=False, precision=None, relative=False, styles=None
+    ):
+        """Convert a DOMShapeRecord with xfl_domshape_to_svg, or get the
+        result of converting a shape with the same content and options."""
+        key = self.get_key(shape_record, mask, precision, relative)
+        result = self.entries.get(key)
+        if result is None:
+            result = xfl_domshape_to_svg(
+                shape_record, mask, precision, relative, styles
+            )
+            self.entries[key] = result
+        return result
+
+    def convert_many(
+        self, shape_records, mask=False, precision=None, relative=False, styles=None
+    ):
+        """Same as convert() for each shape, but the shapes that aren't cached
+        are converted together with xfl_domshapes_to_svg."""
+        keys = [
+            self.get_key(shape_record, mask, precision, relative)
+            for shape_record in shape_records
+        ]
+        results = [self.entries.get(key) for key in keys]
+
+        missing = {}
+        for key, shape_record, result in zip(keys, shape_records, results):
+            if result is None:
+                missing.setdefault(key, shape_record)
+
+        svgs = xfl_domshapes_to_svg(
+            list(missing.values()),
+            mask,
+            precision=precision,
+            relative=relative,
+            styles=styles,
+        )
+        converted = dict(zip(missing, svgs))
+        for key, result in converted.items():
+            self.entries[key] = result
+
+        return [
+            converted[key] if result is None else result
+            for key, result in zip(keys, results)
+        ]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self, path):
+        """Add the entries of a file written by save(). Files written by other
+        versions of the converter are ignored."""
+        entries = _read_pickle(path)
+        if entries is None:
+            return
+
+        for key, value in entries.items():
+            self.entries[key] = value
+
+    def save(self, path=None):
+        """Write every entry to a file. Defaults to the path the cache was
+        created with."""
+        path = path or self.path
+        if path is None:
+            raise Exception("No path to save the shape cache to")
+
+        # Least recently used first, so load() keeps the same eviction order
+        entries = dict(self.entries.items())
+        _write_pickle(path, entries)
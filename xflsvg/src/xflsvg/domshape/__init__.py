@@ -1,3 +1,3 @@
-from .shape import xfl_domshape_to_svg
+from .shape import DOMShapeRecord, xfl_domshape_to_svg, xfl_domshapes_to_svg
 
-__all__ = ["xfl_domshape_to_svg"]
+__all__ = ["DOMShapeRecord", "xfl_domshape_to_svg", "xfl_domshapes_to_svg"]
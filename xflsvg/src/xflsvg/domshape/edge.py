@@ -38,11 +38,12 @@ in how everything works, read on.
 #    <path> element, and assign fill/stroke style attributes to the <path>.
 
 
-from collections import defaultdict
+from collections import defaultdict, deque
 import re
 from typing import Iterator
 import xml.etree.ElementTree as ET
 
+import numpy as np
 
 # The XFL edge format can be described as follows:
 #
@@ -82,27 +83,6 @@ EDGE_TOKENIZER = re.compile(
 #   * Whitespace is automatically ignored, as we only match what we want.
 #   * The negative lookbehind assertion (?<!S) is needed to avoid matching the
 #     digit in select commands as a number.
-
-
-# After tokenizing, we need to parse numbers:
-
-
-def parse_number(num: str) -> float:
-    """Parse an XFL edge format number."""
-    if num[0] == "#":
-        # Signed, 32-bit number in hex
-        parts = num[1:].split(".")
-        # Pad to 8 digits
-        hex_num = "{:>06}{:<02}".format(*parts)
-        num = int.from_bytes(bytes.fromhex(hex_num), "big", signed=True)
-        # Account for hex scaling and Animate's 20x scaling
-        return (num / 256) / 20
-    else:
-        # Decimal number. Account for Animate's 20x scaling
-        return float(num) / 20
-
-
-# Notes:
 #   * The <path>s produced by Animate's SVG export sometimes have slightly
 #     different numbers (e.g. flooring or subtracting 1 from decimals before
 #     dividing by 20). It's not clear how this works or if it's even intended,
@@ -111,6 +91,93 @@ def parse_number(num: str) -> float:
 #     it makes no difference for SVG.
 
 
+# Tokenizing and parsing one number at a time is the slowest part of shape
+# conversion, so shapes are actually parsed in bulk: all "edges" attributes of
+# a shape at once, into NumPy arrays of per-point command codes and integer
+# coordinates. Coordinates are in 1/256 twips, the resolution of hex numbers, so
+# every hex number and every decimal Animate writes (whole or half twips) is
+# stored exactly. Other decimals are rounded to the nearest 1/256 twip.
+
+MOVE = 0  # Destination of a "move to"
+LINE = 1  # Destination of a "line to"
+QUAD_CONTROL = 2  # Control point of a "quad to". Always followed by QUAD_END
+QUAD_END = 3  # Destination of a "quad to"
+
+# Number of coordinate units in a twip, and in a pixel (Animate's 20x scaling)
+UNITS_PER_TWIP = 256
+UNITS_PER_PIXEL = 20 * UNITS_PER_TWIP
+
+# str.translate() table that maps each command character to the command codes
+# of its points and deletes every other ASCII character
+_COMMAND_CODES = str.maketrans(
+    {
+        **{i: None for i in range(128)},
+        "!": chr(MOVE),
+        "|": chr(LINE),
+        "/": chr(LINE),
+        "[": chr(QUAD_CONTROL) + chr(QUAD_END),
+        "]": chr(QUAD_CONTROL) + chr(QUAD_END),
+    }
+)
+
+_COMMAND_TOKENS = {"!", "|", "/", "[", "]"}
+
+
+def _parse_hex_units(num: str) -> int:
+    """Parse an XFL edge format hex number into 1/256 twips."""
+    # Signed, 32-bit number: up to 6 whole digits and 2 fraction digits
+    whole, _, fraction = num[1:].partition(".")
+    value = (int(whole, 16) << 8) | int(fraction.ljust(2, "0"), 16)
+    if value >= 1 << 31:
+        value -= 1 << 32
+    return value
+
+
+def edge_formats_to_arrays(edge_formats) -> tuple:
+    """Parse many XFL edge format strings at once.
+
+    Args:
+        edge_formats: Sequence of "edges" attributes
+
+    Returns a tuple:
+        commands: (n,) uint8 array with the command code of each point
+        points: (n, 2) int64 array of points, in 1/256 twips
+        counts: Number of points parsed out of each string
+    """
+    codes = [edges.translate(_COMMAND_CODES) for edges in edge_formats]
+    counts = [len(edge_codes) for edge_codes in codes]
+
+    joined = " ".join(edge_formats)
+    numbers = [
+        token
+        for token in EDGE_TOKENIZER.findall(joined)
+        if token not in _COMMAND_TOKENS
+    ]
+    if "#" in joined:
+        numbers = [
+            _parse_hex_units(num) / UNITS_PER_TWIP if num[0] == "#" else num
+            for num in numbers
+        ]
+
+    commands = np.frombuffer("".join(codes).encode("latin-1"), dtype=np.uint8)
+    assert len(numbers) == 2 * len(commands), "Malformed edge format"
+    points = np.array(numbers, dtype=np.float64) * UNITS_PER_TWIP
+    points = np.rint(points).astype(np.int64).reshape(-1, 2)
+    return commands, points, counts
+
+
+def edge_format_to_arrays(edges: str) -> tuple:
+    """Parse the XFL edge format into NumPy arrays.
+
+    Returns a tuple:
+        commands: (n,) uint8 array with the command code of each point: MOVE,
+            LINE, QUAD_CONTROL or QUAD_END
+        points: (n, 2) int64 array of points, in 1/256 twips
+    """
+    commands, points, _ = edge_formats_to_arrays((edges,))
+    return commands, points
+
+
 # Now, we can parse the edge format. To join segments into shapes, though, we
 # will need a way to reverse segments (for normalizing them so that the filled
 # shape is always on the left). That is, if we have a segment like:
@@ -144,10 +211,13 @@ def parse_number(num: str) -> float:
 #
 #    [E, D, (C,), B, A]
 #
-# In practice, each point is represented as a coordinate string, so the actual
+# In practice, each point is an (x, y) tuple of floats in pixels, so the actual
 # point list might look like:
 #
-#   ["0 0", "10 0", ("20 10",), "30 0", "40 0"]
+#   [(0.0, 0.0), (10.0, 0.0), ((20.0, 10.0),), (30.0, 0.0), (40.0, 0.0)]
+#
+# Points are only converted to strings when they're written to the SVG path
+# format. (Control points are the only points in a 1-tuple.)
 #
 # This next function converts the XFL edge format into point lists. Since each
 # "edges" attribute can contain multiple segments, but each point list only
@@ -163,69 +233,184 @@ def edge_format_to_point_lists(edges: str) -> Iterator[list]:
     Yields:
         One point list for each segment parsed out of `edges`
     """
-    tokens = iter(EDGE_TOKENIZER.findall(edges))
+    commands, points = edge_format_to_arrays(edges)
+    return _arrays_to_point_lists(commands.tolist(), _to_pixel_points(points))
+
+
+def _to_pixel_points(points):
+    """Convert an array of points in 1/256 twips to a list of (x, y) pixel
+    tuples."""
+    # Both units are exact, so this gives the same floats as dividing the
+    # original numbers by 20. Adding 0.0 turns -0.0 into 0.0, so "-0" and "0"
+    # are the same point.
+    pixels = points / UNITS_PER_PIXEL + 0.0
+    return list(zip(pixels[:, 0].tolist(), pixels[:, 1].tolist()))
 
-    def next_point():
-        return f"{parse_number(next(tokens))} {parse_number(next(tokens))}"
 
-    assert next(tokens) == "!", "Edge format must start with moveto (!) command"
+def _arrays_to_point_lists(commands, points):
+    """Split the points parsed out of one "edges" attribute into point lists.
 
-    prev_point = next_point()
+    Args:
+        commands: List of command codes
+        points: List of (x, y) points, one for each command code
+    """
+    assert commands[0] == MOVE, "Edge format must start with moveto (!) command"
+
+    prev_point = points[0]
     point_list = [prev_point]
 
-    try:
-        while True:
-            command = next(tokens)
-            curr_point = next_point()
-
-            if command == "!":
-                # Move to
-                if curr_point != prev_point:
-                    # If a move command doesn't change the current point, we
-                    # can ignore it. Otherwise, we must yield the current point
-                    # list and begin a new one.
-                    yield point_list
-                    point_list = [curr_point]
-                    prev_point = curr_point
-            elif command in "|/":
-                # Line to
-                point_list.append(curr_point)
+    for command, curr_point in zip(commands[1:], points[1:]):
+        if command == MOVE:
+            if curr_point != prev_point:
+                # If a move command doesn't change the current point, we can
+                # ignore it. Otherwise, we must yield the current point list
+                # and begin a new one.
+                yield point_list
+                point_list = [curr_point]
                 prev_point = curr_point
-            else:
-                # Quad to. The control point (curr_point) is marked by putting
-                # it in a tuple.
-                point_list.append((curr_point,))
-                prev_point = next_point()
-                point_list.append(prev_point)
-    except StopIteration:
-        yield point_list
+        elif command == QUAD_CONTROL:
+            # The control point is marked by putting it in a tuple
+            point_list.append((curr_point,))
+        else:
+            # Line to, or the destination of a quad to
+            point_list.append(curr_point)
+            prev_point = curr_point
+
+    yield point_list
+
+
+# The next functions convert point lists into the SVG path format. Formatting
+# floats is about as slow as parsing them, and most points are shared by
+# several point lists (e.g. by the shapes on either side of a segment), so
+# points are formatted once up front.
+#
+# By default, coordinates are written with full precision. A precision rounds
+# them to that many decimal places, which makes the output much smaller.
+# Relative commands ("l" and "q") make it smaller still, since the offsets
+# between neighboring points are shorter than their coordinates. Relative
+# offsets are computed between points that were already rounded to the
+# precision, so rounding errors don't add up along a path.
+
+
+def format_number(value: float, precision=None) -> str:
+    """Format a number for an SVG attribute.
+
+    With a precision, the number is rounded to that many decimal places and
+    written without trailing zeros. Otherwise, it's written with full
+    precision, and whole numbers lose their ".0", so numbers read from XFL
+    files are written the way they were read.
+    """
+    if precision is None:
+        result = repr(value)
+        if result.endswith(".0"):
+            return result[:-2]
+        return result
 
+    result = f"{value:.{precision}f}"
+    if "." in result:
+        result = result.rstrip("0").rstrip(".")
+    return "0" if result == "-0" else result
 
-# The next function converts point lists into the SVG path format.
 
+def format_points(points, precision=None) -> dict:
+    """Format (x, y) points for the SVG path format.
+
+    Args:
+        points: Points to format
+        precision: Optional number of decimal places to round coordinates to
+
+    Returns a dict of {point: "x y"}
+    """
+    if precision is None:
+        return {point: f"{point[0]} {point[1]}" for point in dict.fromkeys(points)}
+
+    return {
+        point: f"{format_number(point[0], precision)} "
+        f"{format_number(point[1], precision)}"
+        for point in dict.fromkeys(points)
+    }
+
+
+def _point_list_to_relative_path_format(point_list: list, precision: int) -> str:
+    """Convert a point list into the SVG path format with relative commands."""
+    scale = 10**precision
+
+    def offset(point, origin):
+        # Points are rounded to integers of 1/scale px, so offsets are exact
+        dx = (point[0] - origin[0]) / scale
+        dy = (point[1] - origin[1]) / scale
+        return f"{format_number(dx, precision)} {format_number(dy, precision)}"
 
-def point_list_to_path_format(point_list: list) -> str:
-    """Convert a point list into the SVG path format."""
     point_iter = iter(point_list)
-    path = ["M", next(point_iter)]
+    x, y = next(point_iter)
+    prev_point = (round(x * scale), round(y * scale))
+    path = ["M", offset(prev_point, (0, 0))]
     last_command = "M"
 
-    try:
-        while True:
+    for point in point_iter:
+        command = "q" if len(point) == 1 else "l"
+        if command != last_command:
+            path.append(command)
+            last_command = command
+
+        if command == "q":
+            # The control point and the destination point are both relative
+            # to the start of the curve
+            x, y = point[0]
+            path.append(offset((round(x * scale), round(y * scale)), prev_point))
             point = next(point_iter)
-            command = "Q" if isinstance(point, tuple) else "L"
-            if command != last_command:
-                path.append(command)
-                last_command = command
 
-            if command == "Q":
-                # Append control point and destination point
-                path.append(point[0])
-                path.append(next(point_iter))
-            else:
-                path.append(point)
-    except StopIteration:
-        return " ".join(path)
+        x, y = point
+        curr_point = (round(x * scale), round(y * scale))
+        path.append(offset(curr_point, prev_point))
+        prev_point = curr_point
+
+    return " ".join(path)
+
+
+def point_list_to_path_format(
+    point_list: list, point_strings=None, precision=None, relative=False
+) -> str:
+    """Convert a point list into the SVG path format.
+
+    Args:
+        point_list: Point list to convert
+        point_strings: Optional {point: "x y"} dict with every point of
+            `point_list` already formatted, see `format_points()`. Not used for
+            relative commands.
+        precision: Optional number of decimal places to round coordinates to
+        relative: If True, use relative "l" and "q" commands after the
+            initial "M". Requires a precision.
+    """
+    if relative:
+        if precision is None:
+            raise ValueError("Relative path commands need a precision")
+        return _point_list_to_relative_path_format(point_list, precision)
+
+    if point_strings is None:
+        point_strings = format_points(
+            (point[0] if len(point) == 1 else point for point in point_list),
+            precision,
+        )
+
+    point_iter = iter(point_list)
+    path = ["M", point_strings[next(point_iter)]]
+    last_command = "M"
+
+    for point in point_iter:
+        command = "Q" if len(point) == 1 else "L"
+        if command != last_command:
+            path.append(command)
+            last_command = command
+
+        if command == "Q":
+            # Append the control point, then the destination point
+            path.append(point_strings[point[0]])
+            point = next(point_iter)
+
+        path.append(point_strings[point])
+
+    return " ".join(path)
 
 
 # Finally, we can convert XFL <Edge> elements into SVG <path> elements. The
@@ -244,10 +429,12 @@ def point_list_to_path_format(point_list: list) -> str:
 #         * Pick an unused segment. If it's already closed (start point equals
 #           final point), convert it to the SVG path format.
 #         * Otherwise, find a segment that starts with the current segment's
-#           end point and does not end on an already used point. Join it to the
-#           current segment and repeat until the shape is closed, then convert.
-#         * If there are multiple segments to choose from, pick one and
-#           backtrack if you hit a dead end.
+#           end point. Join it to the current segment and repeat until the
+#           shape is closed, then convert. Segments are indexed by their start
+#           point, so finding the next one is a dict lookup.
+#         * If there are multiple segments to choose from, pick any. If that
+#           leads back to a point that's already in the shape, the segments
+#           since that point form a shape of their own. Split it off and go on.
 #         * When all segments have been joined into shapes and converted,
 #           concatenate the path strings and put them in *one* SVG <path>
 #           element. (This ensures that holes work correctly.) Finally, look up
@@ -261,16 +448,21 @@ def point_list_to_path_format(point_list: list) -> str:
 #       element. Look up the stroke attributes and assign them to the <path>.
 #
 #
-# This algorithm is split across the next two functions:
+# This algorithm is split across the next functions:
 #   * `point_lists_to_shapes()` joins point lists into filled shapes.
-#   * `xfl_edge_to_svg_path()` does everything else.
+#   * `edge_attributes_to_point_lists()` sorts segments by style and joins
+#     them with `point_lists_to_shapes()`.
+#   * `edge_attributes_to_svg_path()` converts the result to <path>s.
+#   * `xfl_edge_attributes()` pulls the needed attributes out of <Edge>
+#     elements, and `xfl_edge_to_svg_path()` ties it all together.
 #
 #
 # Assumptions:
 #   * Segments never cross. So, we only need to join them at their ends.
-#   * For filled shapes, there's only one way to join the segments so that no
-#     segment is left out. So, we don't need to worry about making the wrong
-#     decision when there are multiple segments to pick from.
+#   * For filled shapes, every point has as many segments leaving it as
+#     arriving at it. So, we never get stuck, and it doesn't matter which
+#     segment we pick when there are multiple choices: the filled area is made
+#     of the same segments either way.
 #
 # Notes:
 #   * For stroked paths, Animate joins together segments by their start/end
@@ -293,14 +485,17 @@ def point_list_to_path_format(point_list: list) -> str:
 def point_lists_to_shapes(point_lists):
     """Join point lists and fill style IDs into shapes.
 
+    Takes time linear in the number of point lists: each one is added to a
+    walk and removed from it exactly once.
+
     Args:
         point_lists: [(point_list, fill style ID), ...]
 
     Returns:
         {fill style ID: [shape point list, ...]}
     """
-    # {fill style ID: {origin point: [point list, ...]}}
-    graph = defaultdict(lambda: defaultdict(list))
+    # {fill style ID: {origin point: deque([point list, ...])}}
+    graph = defaultdict(lambda: defaultdict(deque))
 
     # {fill style ID: [shape point list, ...]}
     shapes = defaultdict(list)
@@ -313,42 +508,68 @@ def point_lists_to_shapes(point_lists):
         else:
             graph[fill_id][point_list[0]].append(point_list)
 
-    def walk(curr_point, used_points, origin, fill_graph):
-        """Recursively join point lists into shapes."""
-        for i in range(len(fill_graph[curr_point])):
-            next_point_list = fill_graph[curr_point][i]
-            next_point = next_point_list[-1]
-
-            if next_point == origin:
-                # Found a cycle. This shape is now closed
-                del fill_graph[curr_point][i]
-                return next_point_list
-            elif next_point not in used_points:
-                # Try this point list
-                used_points.add(next_point)
-                shape = walk(next_point, used_points, origin, fill_graph)
-                if shape is None:
-                    # Backtrack
-                    used_points.remove(next_point)
-                else:
-                    del fill_graph[curr_point][i]
-                    # Concat this point list, removing the redundant start move
-                    return next_point_list + shape[1:]
-
-    # For each fill style ID, pick a random origin and join point lists into
-    # shapes with walk() until we're done.
+    # For each fill style ID, pick a random origin and walk from it, taking any
+    # unused point list at each point, until we're back at the origin. Every
+    # point has as many point lists leaving it as arriving at it, so the walk
+    # never gets stuck. When the walk comes back to a point it has already
+    # visited, the point lists since that visit form a closed shape and are
+    # removed from the walk.
     for fill_id, fill_graph in graph.items():
-        for origin in fill_graph.keys():
-            while fill_graph[origin]:
-                point_list = fill_graph[origin].pop()
-                curr_point = point_list[-1]
+        fill_shapes = shapes[fill_id]
+        for origin, origin_point_lists in fill_graph.items():
+            while origin_point_lists:
+                point_list = origin_point_lists.pop()
+                walk = [point_list]
+                # {point: index in `walk` of the point list that leaves it}
+                visited = {origin: 0}
+
+                while True:
+                    point = point_list[-1]
+                    start = visited.get(point)
+                    if start is None:
+                        visited[point] = len(walk)
+                    else:
+                        # Concat the point lists, removing their redundant
+                        # start moves. Copy the first point list, since it may
+                        # also be a stroke's.
+                        shape = list(walk[start])
+                        for point_list in walk[start + 1 :]:
+                            shape.extend(point_list[1:])
+                        fill_shapes.append(shape)
+
+                        if start == 0:
+                            # Back at the origin
+                            break
+
+                        # Go on from `point`, which stays visited
+                        for point_list in walk[start + 1 :]:
+                            del visited[point_list[0]]
+                        del walk[start:]
+
+                    next_point_lists = fill_graph.get(point)
+                    assert next_point_lists, "Failed to build shape"
+                    point_list = next_point_lists.popleft()
+                    walk.append(point_list)
 
-                shape = walk(curr_point, {origin, curr_point}, origin, fill_graph)
-                assert shape is not None, "Failed to build shape"
+    return shapes
 
-                shapes[fill_id].append(point_list + shape[1:])
 
-    return shapes
+def xfl_edge_attributes(edges_element: ET.Element) -> tuple:
+    """Extract the attributes needed for conversion from an XFL <edges> element.
+
+    Returns a tuple with one entry per <Edge> element:
+        ((edges, fillStyle0, fillStyle1, strokeStyle), ...)
+    """
+    # Ignore the "cubics" attribute, as it's only used by Animate
+    return tuple(
+        (
+            edge.get("edges"),
+            edge.get("fillStyle0"),
+            edge.get("fillStyle1"),
+            edge.get("strokeStyle"),
+        )
+        for edge in edges_element.iterfind(".//{*}Edge[@edges]")
+    )
 
 
 def xfl_edge_to_svg_path(
@@ -358,46 +579,140 @@ def xfl_edge_to_svg_path(
 
     Args:
         edges_element: The <edges> element of a <DOMShape>
-        fill_styles: {fill style ID: style attribute dict}
-        stroke_styles: {stroke style ID: style attribute dict}
+        fill_styles: {fill style ID: mapping of style attributes}
+        stroke_styles: {stroke style ID: mapping of style attributes}
 
     Returns a tuple of lists, each containing <path> elements:
         ([filled path, ...], [stroked path, ...])
     """
-    fill_edges = []
-    stroke_paths = defaultdict(list)
+    return edge_attributes_to_svg_path(
+        xfl_edge_attributes(edges_element), fill_styles, stroke_styles
+    )
 
-    # Ignore the "cubics" attribute, as it's only used by Animate
-    for edge in edges_element.iterfind(".//{*}Edge[@edges]"):
-        edge_format = edge.get("edges")
-        fill_id_left = edge.get("fillStyle0")
-        fill_id_right = edge.get("fillStyle1")
-        stroke_id = edge.get("strokeStyle")
 
-        for point_list in edge_format_to_point_lists(edge_format):
+def parse_shape_edges(shapes_edges) -> list:
+    """Parse the "edges" attributes of many shapes at once.
+
+    Parsing has a fixed cost per call, so it's faster to parse every shape of
+    a file together than one shape at a time.
+
+    Args:
+        shapes_edges: Sequence of `xfl_edge_attributes()` results
+
+    Returns a list with a tuple for each shape:
+        commands: List of command codes
+        points: List of (x, y) points in pixels, one for each command code
+        counts: Number of points parsed out of each of the shape's edges
+    """
+    commands, points, counts = edge_formats_to_arrays(
+        [edge[0] for edges in shapes_edges for edge in edges]
+    )
+    commands = commands.tolist()
+    points = _to_pixel_points(points)
+
+    result = []
+    start = 0
+    edge_start = 0
+    for edges in shapes_edges:
+        edge_end = edge_start + len(edges)
+        shape_counts = counts[edge_start:edge_end]
+        end = start + sum(shape_counts)
+        result.append((commands[start:end], points[start:end], shape_counts))
+        start = end
+        edge_start = edge_end
+
+    return result
+
+
+def edge_attributes_to_point_lists(edges):
+    """Convert the output of `xfl_edge_attributes()` into point lists.
+
+    This is the geometry of `edge_attributes_to_svg_path()`, before it's
+    converted to the SVG path format.
+
+    Returns a tuple:
+        {fill style ID: [shape point list, ...]}
+        {stroke style ID: [segment point list, ...]}
+    """
+    shapes, stroke_point_lists, _ = _edge_attributes_to_point_lists(edges)
+    return shapes, stroke_point_lists
+
+
+def _edge_attributes_to_point_lists(edges, parsed_edges=None):
+    """Same as `edge_attributes_to_point_lists()`, but it also returns a list
+    of every point parsed out of `edges`.
+
+    If `parsed_edges` is given, it must be the result of `parse_shape_edges()`
+    for these edges.
+    """
+    fill_edges = []
+    stroke_point_lists = defaultdict(list)
+
+    # Parse every "edges" attribute of the shape at once
+    if parsed_edges is None:
+        (parsed_edges,) = parse_shape_edges((edges,))
+    commands, points, counts = parsed_edges
+
+    start = 0
+    for (_, fill_id_left, fill_id_right, stroke_id), count in zip(edges, counts):
+        end = start + count
+        edge_point_lists = _arrays_to_point_lists(
+            commands[start:end], points[start:end]
+        )
+        start = end
+
+        for point_list in edge_point_lists:
             # Reverse point lists so that the fill is always to the left
             if fill_id_left is not None:
                 fill_edges.append((point_list, fill_id_left))
             if fill_id_right is not None:
                 fill_edges.append((list(reversed(point_list)), fill_id_right))
 
-            # Convert right away since we don't need to join anything into shapes
+            # Strokes don't need to be joined into shapes
             if stroke_id is not None:
-                stroke_paths[stroke_id].append(point_list_to_path_format(point_list))
+                stroke_point_lists[stroke_id].append(point_list)
+
+    return point_lists_to_shapes(fill_edges), stroke_point_lists, points
+
+
+def edge_attributes_to_svg_path(
+    edges,
+    fill_styles: dict,
+    stroke_styles: dict,
+    parsed_edges=None,
+    precision=None,
+    relative=False,
+):
+    """Convert the output of `xfl_edge_attributes()` into SVG <path> elements.
+
+    Same as `xfl_edge_to_svg_path()`, but it doesn't need the XML element. If
+    the edges were already parsed with `parse_shape_edges()`, pass the result
+    as `parsed_edges`. `precision` and `relative` set the format of the path
+    data, see `point_list_to_path_format()`.
+    """
+    shapes, stroke_point_lists, points = _edge_attributes_to_point_lists(
+        edges, parsed_edges
+    )
+    point_strings = None if relative else format_points(points, precision)
+
+    def to_path_format(point_lists):
+        return " ".join(
+            point_list_to_path_format(pl, point_strings, precision, relative)
+            for pl in point_lists
+        )
 
     filled_paths = []
-    shapes = point_lists_to_shapes(fill_edges)
     for fill_id, point_lists in shapes.items():
-        path = ET.Element("path", fill_styles[fill_id])
+        path = ET.Element("path", **fill_styles[fill_id])
         # Animate ends each SVG path with the "closepath" (Z) command, but we
         # shouldn't need it since shapes are always closed.
-        path.set("d", " ".join(point_list_to_path_format(pl) for pl in point_lists))
+        path.set("d", to_path_format(point_lists))
         filled_paths.append(path)
 
     stroked_paths = []
-    for stroke_id, path_data in stroke_paths.items():
-        stroke = ET.Element("path", stroke_styles[stroke_id])
-        stroke.set("d", " ".join(path_data))
+    for stroke_id, point_lists in stroke_point_lists.items():
+        stroke = ET.Element("path", **stroke_styles[stroke_id])
+        stroke.set("d", to_path_format(point_lists))
         stroked_paths.append(stroke)
 
     return filled_paths, stroked_paths
@@ -4,6 +4,8 @@
 
 
 from dataclasses import dataclass
+from functools import cached_property
+import hashlib
 import xml.etree.ElementTree as ET
 
 from .util import check_known_attrib, get_matrix
@@ -79,7 +81,12 @@ class LinearGradient:
             ET.SubElement(element, "stop", attrib)
         return element
 
-    @property
+    @cached_property
     def id(self):
-        """Unique ID used to dedup SVG elements in <defs>."""
-        return f"Gradient_{hash(self) & 0xFFFF_FFFF:08x}"
+        """Unique ID used to dedup SVG elements in <defs>.
+
+        The ID is a digest of the gradient, so it's the same in every process.
+        """
+        values = repr((self.start, self.end, self.stops, self.spread_method))
+        digest = hashlib.blake2b(values.encode(), digest_size=8)
+        return f"Gradient_{digest.hexdigest()}"
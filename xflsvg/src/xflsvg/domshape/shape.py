@@ -1,47 +1,167 @@
 """Convert the XFL <DOMShape> element to SVG <path> elements."""
 
+from dataclasses import dataclass
+from functools import partial
+from types import MappingProxyType
 import xml.etree.ElementTree as ET
 import warnings
 
-from .edge import xfl_edge_to_svg_path
-from .style import parse_fill_style, parse_stroke_style
+from .edge import edge_attributes_to_svg_path, parse_shape_edges, xfl_edge_attributes
+from .style import StyleTable
 
+# Mask fills are white so that the mask is fully transparent
+_MASK_FILL_STYLE = MappingProxyType({"fill": "#FFFFFF", "stroke": "none"})
 
-def xfl_domshape_to_svg(domshape, mask=False):
+
+@dataclass(frozen=True)
+class DOMShapeRecord:
+    """The parts of an XFL <DOMShape> element that are needed for conversion.
+
+    Extracting these once lets a shape be converted several times (e.g. both
+    normally and as a mask) without searching the XML again.
+    """
+
+    fill_styles: tuple  # ((index, style element), ...)
+    stroke_styles: tuple  # ((index, style element), ...)
+    edges: tuple  # See `xfl_edge_attributes()`
+
+    @classmethod
+    def from_xfl(cls, domshape):
+        """Create a DOMShapeRecord from an XFL <DOMShape> element."""
+        fill_styles = tuple(
+            (style.get("index"), style[0])
+            for style in domshape.iterfind(".//{*}FillStyle")
+        )
+        stroke_styles = tuple(
+            (style.get("index"), style[0])
+            for style in domshape.iterfind(".//{*}StrokeStyle")
+        )
+
+        edges_element = domshape.find("{*}edges")
+        if edges_element is None:
+            edges = ()
+        else:
+            edges = xfl_edge_attributes(edges_element)
+
+        return cls(fill_styles, stroke_styles, edges)
+
+
+def xfl_domshape_to_svg(
+    domshape, mask=False, precision=None, relative=False, styles=None
+):
     """Convert the XFL <DOMShape> element to SVG <path> elements.
 
     Args:
-        domshape: An XFL <DOMShape> element
+        domshape: An XFL <DOMShape> element or a DOMShapeRecord
         mask: If True, all fill colors will be set to #FFFFFF. This ensures
               that the resulting mask is fully transparent.
+        precision: Optional number of decimal places to round path
+              coordinates to. By default, they have full precision.
+        relative: If True, path data uses relative commands, which is more
+              compact. Requires a precision.
+        styles: Optional StyleTable to share parsed styles with other
+              conversions
 
     Returns a 3-tuple of:
         SVG <g> element containing filled <path>s
         SVG <g> element containing stroked <path>s
         dict of extra elements to put in <defs> (e.g. filters and gradients)
     """
+    if not isinstance(domshape, DOMShapeRecord):
+        domshape = DOMShapeRecord.from_xfl(domshape)
+
+    if styles is None:
+        styles = StyleTable()
+
+    return _shape_record_to_svg(domshape, mask, styles, None, precision, relative)
+
+
+def xfl_domshapes_to_svg(
+    domshapes,
+    mask=False,
+    executor=None,
+    chunksize=64,
+    precision=None,
+    relative=False,
+    styles=None,
+):
+    """Convert many XFL <DOMShape> elements to SVG <path> elements.
+
+    Same as calling `xfl_domshape_to_svg()` on each shape, but the edges of all
+    shapes are parsed together, which is faster for the many small shapes of a
+    typical file.
+
+    Args:
+        domshapes: Sequence of XFL <DOMShape> elements or DOMShapeRecords
+        mask, precision, relative, styles: Same as for `xfl_domshape_to_svg()`
+        executor: Optional concurrent.futures executor, e.g. a
+            ProcessPoolExecutor. If given, shapes are converted on it in chunks.
+            Each chunk uses its own StyleTable, and styles is ignored.
+        chunksize: Number of shapes in each chunk sent to the executor
+
+    Returns a list with the result of `xfl_domshape_to_svg()` for each shape.
+    """
+    if relative and precision is None:
+        raise ValueError("Relative path commands need a precision")
+
+    records = [
+        (
+            domshape
+            if isinstance(domshape, DOMShapeRecord)
+            else DOMShapeRecord.from_xfl(domshape)
+        )
+        for domshape in domshapes
+    ]
+
+    if executor is not None:
+        chunks = [
+            records[start : start + chunksize]
+            for start in range(0, len(records), chunksize)
+        ]
+        convert = partial(
+            xfl_domshapes_to_svg, mask=mask, precision=precision, relative=relative
+        )
+        results = executor.map(convert, chunks)
+        return [svg for chunk_result in results for svg in chunk_result]
+
+    if styles is None:
+        styles = StyleTable()
+
+    parsed_edges = parse_shape_edges([record.edges for record in records])
+    return [
+        _shape_record_to_svg(record, mask, styles, record_edges, precision, relative)
+        for record, record_edges in zip(records, parsed_edges)
+    ]
+
+
+def _shape_record_to_svg(
+    domshape, mask, styles, parsed_edges=None, precision=None, relative=False
+):
     extra_defs = {}
 
     fill_styles = {}
-    for style in domshape.iterfind(".//{*}FillStyle"):
-        index = style.get("index")
+    for index, style in domshape.fill_styles:
         if mask:
-            # Set the fill to white so that the mask is fully transparent.
-            fill_styles[index] = {"fill": "#FFFFFF", "stroke": "none"}
+            fill_styles[index] = _MASK_FILL_STYLE
         else:
-            fill_style, fill_extra = parse_fill_style(style[0])
+            fill_style, fill_extra = styles.get_fill_style(style)
             fill_styles[index] = fill_style
             extra_defs.update(fill_extra)
 
     stroke_styles = {}
-    for style in domshape.iterfind(".//{*}StrokeStyle"):
+    for index, style in domshape.stroke_styles:
         # TODO: Figure out how strokes are supposed to behave in masks
         if mask:
             warnings.warn("Strokes in masks are not supported")
-        stroke_styles[style.get("index")] = parse_stroke_style(style[0])
+        stroke_styles[index] = styles.get_stroke_style(style)
 
-    filled_paths, stroked_paths = xfl_edge_to_svg_path(
-        domshape.find("{*}edges"), fill_styles, stroke_styles
+    filled_paths, stroked_paths = edge_attributes_to_svg_path(
+        domshape.edges,
+        fill_styles,
+        stroke_styles,
+        parsed_edges,
+        precision,
+        relative,
     )
 
     fill_g = None
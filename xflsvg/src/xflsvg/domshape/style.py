@@ -1,11 +1,17 @@
 """Convert XFL fill and stroke styles to SVG attributes."""
 
+from collections import OrderedDict
+import threading
+from types import MappingProxyType
 import xml.etree.ElementTree as ET
 import warnings
 
 from .gradient import LinearGradient
 from .util import check_known_attrib
 
+# Default number of styles of each kind that a StyleTable keeps
+MAX_INTERNED_STYLES = 4096
+
 
 def xml_str(element):
     return ET.tostring(element, encoding="unicode")
@@ -36,22 +42,29 @@ def parse_fill_style(style):
         attrib: Dict of SVG style attributes
         extra_defs: Dict of {element_id: SVG element to put in <defs>}
     """
+    attrib, gradients = _parse_fill_style(style)
+    return attrib, {gradient.id: gradient.to_svg() for gradient in gradients}
+
+
+def _parse_fill_style(style):
+    """Same as parse_fill_style, but returns the gradients themselves instead
+    of their SVG elements. Gradients are immutable, so they can be shared."""
     attrib = {"stroke": "none"}
-    extra_defs = {}
+    gradients = ()
 
     if style.tag.endswith("SolidColor"):
         update(attrib, ("fill", "fill-opacity"), parse_solid_color(style))
     elif style.tag.endswith("LinearGradient"):
         gradient = LinearGradient.from_xfl(style)
         attrib["fill"] = f"url(#{gradient.id})"
-        extra_defs[gradient.id] = gradient.to_svg()
+        gradients = (gradient,)
     elif style.tag.endswith("RadialGradient"):
         # TODO: Support RadialGradient
         warnings.warn("RadialGradient is not supported yet")
     else:
         warnings.warn(f"Unknown fill style: {xml_str(style)}")
 
-    return attrib, extra_defs
+    return attrib, gradients
 
 
 def parse_stroke_style(style):
@@ -95,3 +108,80 @@ def parse_stroke_style(style):
     )
 
     return attrib
+
+
+def _style_key(element):
+    """Get a hashable key with the tag, attributes and children of an element.
+
+    The key only holds strings and tuples, so it doesn't change if the element
+    is modified later.
+    """
+    if len(element) == 0:
+        return element.tag, tuple(element.attrib.items())
+    return (
+        element.tag,
+        tuple(element.attrib.items()),
+        tuple(map(_style_key, element)),
+    )
+
+
+class StyleTable:
+    """Parsed fill and stroke styles, shared by equal style elements.
+
+    Shapes use the same few styles again and again, so each distinct style is
+    parsed once. A table keeps up to max_entries styles of each kind and
+    evicts the least recently used ones. Results are read-only, and tables can
+    be used from several threads.
+
+    Each XflReader has its own table. Conversion functions that aren't given a
+    table use a new one for the duration of the call.
+    """
+
+    def __init__(self, max_entries=MAX_INTERNED_STYLES):
+        self.max_entries = max_entries
+        self._fill_styles = OrderedDict()  # {style key: (attrib, gradients)}
+        self._stroke_styles = OrderedDict()  # {style key: attrib}
+        self._lock = threading.Lock()
+
+    def _get(self, table, style, parse):
+        key = _style_key(style)
+        with self._lock:
+            result = table.get(key)
+            if result is not None:
+                table.move_to_end(key)
+                return result
+
+        # Parse outside the lock. If two threads parse the same style, both
+        # results are equal.
+        result = parse(style)
+        with self._lock:
+            table[key] = result
+            while len(table) > self.max_entries:
+                table.popitem(last=False)
+        return result
+
+    def get_fill_style(self, style):
+        """Same as parse_fill_style, but the attributes are a shared read-only
+        mapping. Gradient elements are created for each call, so callers can
+        modify them."""
+        attrib, gradients = self._get(self._fill_styles, style, _parse_shared_fill)
+        if not gradients:
+            return attrib, {}
+        return attrib, {gradient.id: gradient.to_svg() for gradient in gradients}
+
+    def get_stroke_style(self, style):
+        """Same as parse_stroke_style, but returns a shared read-only
+        mapping."""
+        return self._get(self._stroke_styles, style, _parse_shared_stroke)
+
+    def __len__(self):
+        return len(self._fill_styles) + len(self._stroke_styles)
+
+
+def _parse_shared_fill(style):
+    attrib, gradients = _parse_fill_style(style)
+    return MappingProxyType(attrib), gradients
+
+
+def _parse_shared_stroke(style):
+    return MappingProxyType(parse_stroke_style(style))
@@ -0,0 +1,345 @@
+"""
+Access to the files that make up an XFL document.
+
+XflReader reads DOMDocument.xml and LIBRARY/*.xml through one of these classes,
+so it doesn't need to care where the files are stored. File names are always
+relative to the root of the XFL document and always use "/" as a separator.
+"""
+
+import marshal
+import mmap
+import os
+import pickle
+import struct
+import xml.etree.ElementTree as etree
+import zipfile
+
+from .cache import CACHE_FORMAT_VERSION
+
+DOCUMENT_NAME = "DOMDocument.xml"
+
+# File layout of a compiled XFL file:
+#     magic, CACHE_FORMAT_VERSION (u32), index offset (u64), index length (u64),
+#     member data..., index
+# The index is marshaled. See write_compiled_xfl. The magic and version are
+# checked before anything is loaded.
+COMPILED_XFL_MAGIC = b"XFLSVGC\x03"
+_COMPILED_XFL_HEADER = struct.Struct("<IQQ")
+
+# Children of <DOMShape> that are only needed to convert the shape. Compiled
+# files store them apart from the rest of the tree, so opening a file never
+# loads them.
+_SHAPE_CONTENT_TAGS = {"fills", "strokes", "edges"}
+
+
+class _XflFiles:
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class XflDirectory(_XflFiles):
+    """An extracted XFL directory."""
+
+    # Shapes in a directory need to be converted when they're loaded
+    precompiled = False
+
+    def __init__(self, path):
+        self.path = os.path.normpath(path)  # deal with trailing /
+        self.id = os.path.basename(self.path)  # MUST come after normpath
+
+    def _get_path(self, name):
+        return os.path.join(self.path, *name.split("/"))
+
+    def exists(self, name):
+        return os.path.exists(self._get_path(name))
+
+    def read(self, name):
+        with open(self._get_path(name), "rb") as xml_file:
+            return xml_file.read()
+
+    def open(self, name):
+        return open(self._get_path(name), "rb")
+
+    def names(self):
+        """List DOMDocument.xml and every XML file in LIBRARY/."""
+        result = [DOCUMENT_NAME]
+        library_path = os.path.join(self.path, "LIBRARY")
+        for dirpath, _, filenames in os.walk(library_path):
+            for filename in filenames:
+                if not filename.endswith(".xml"):
+                    continue
+
+                relpath = os.path.relpath(os.path.join(dirpath, filename), self.path)
+                result.append(relpath.replace(os.sep, "/"))
+
+        return sorted(result)
+
+
+class XflZip(_XflFiles):
+    """An FLA file, which is a zip archive of an XFL directory.
+
+    Members are read straight from the archive when they're needed. Nothing is
+    extracted to disk.
+    """
+
+    precompiled = False
+
+    def __init__(self, zip_file):
+        """
+        Args:
+            zip_file: Path to the .fla file, or an open binary file object
+        """
+        self._zip = zipfile.ZipFile(zip_file)
+        self._members = set(self._zip.namelist())
+
+        if isinstance(zip_file, (str, os.PathLike)):
+            self.path = os.fspath(zip_file)
+        else:
+            self.path = getattr(zip_file, "name", "")
+        self.id = os.path.splitext(os.path.basename(self.path))[0]
+
+    def exists(self, name):
+        return name in self._members
+
+    def read(self, name):
+        return self._zip.read(name)
+
+    def open(self, name):
+        return self._zip.open(name)
+
+    def close(self):
+        self._zip.close()
+
+    def names(self):
+        """List DOMDocument.xml and every XML file in LIBRARY/."""
+        result = [DOCUMENT_NAME]
+        for name in self._members:
+            if name.startswith("LIBRARY/") and name.endswith(".xml"):
+                result.append(name)
+
+        return sorted(result)
+
+
+def pack_element(element, skip_shape_content=False):
+    """Convert an XML element into nested tuples that marshal can store.
+
+    Returns (tag, attributes, text, (packed child, ...)). Tails are dropped, as
+    XFL doesn't use mixed content, and so is whitespace between children. If
+    skip_shape_content is True, the children of <DOMShape>s that are only
+    needed for conversion are left out.
+    """
+    children = element
+    if skip_shape_content and element.tag.endswith("}DOMShape"):
+        children = [
+            child
+            for child in element
+            if child.tag.rpartition("}")[2] not in _SHAPE_CONTENT_TAGS
+        ]
+
+    text = element.text
+    if len(element) and text is not None and not text.strip():
+        text = None
+
+    return (
+        element.tag,
+        element.attrib,
+        text,
+        tuple(pack_element(child, skip_shape_content) for child in children),
+    )
+
+
+def unpack_element(packed):
+    """Rebuild an XML element from pack_element's tuples."""
+    tag, attrib, text, children = packed
+    element = etree.Element(tag, attrib)
+    element.text = text
+    element.extend([unpack_element(child) for child in children])
+    return element
+
+
+class StoredShape:
+    """A shape in a compiled XFL file.
+
+    Its <DOMShape> content and converted SVG are only read from the file the
+    first time they're used.
+    """
+
+    __slots__ = ("_compiled", "_location")
+
+    def __init__(self, compiled, location):
+        self._compiled = compiled
+        self._location = location
+
+    @property
+    def domshape(self):
+        """The complete <DOMShape> element."""
+        offset, length, _, _ = self._location
+        return unpack_element(self._compiled._load(offset, length))
+
+    @property
+    def normal_svg(self):
+        """The shape converted with xfl_domshape_to_svg's default options."""
+        _, _, offset, length = self._location
+        return pickle.loads(self._compiled._view[offset : offset + length])
+
+
+class CompiledXfl(_XflFiles):
+    """An XFL document compiled into a single file by write_compiled_xfl.
+
+    Each member XML file is stored as its parsed tree, without the content of
+    its <DOMShape>s, so opening one doesn't parse any XML. Shapes are stored
+    separately with their converted SVGs, and they're only loaded when they're
+    used. The file is memory-mapped, so processes that open the same file share
+    its pages through the OS page cache.
+
+    Converted shapes are pickled, so only open compiled files from trusted
+    sources. Loading a malicious file can run arbitrary code.
+    """
+
+    precompiled = True
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as compiled_file:
+            self._mmap = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        try:
+            index_offset, index_length = self._read_header()
+            index = self._load(index_offset, index_length)
+        except BaseException:
+            self.close()
+            raise
+
+        self.id = index["id"]
+        self._members = index["members"]
+
+    def _read_header(self):
+        header_end = len(COMPILED_XFL_MAGIC) + _COMPILED_XFL_HEADER.size
+        if self._mmap[: len(COMPILED_XFL_MAGIC)] != COMPILED_XFL_MAGIC:
+            raise Exception(f"Not a compiled XFL file, or an outdated one: {self.path}")
+
+        version, index_offset, index_length = _COMPILED_XFL_HEADER.unpack(
+            self._mmap[len(COMPILED_XFL_MAGIC) : header_end]
+        )
+        if version != CACHE_FORMAT_VERSION:
+            raise Exception(
+                f"Compiled by an incompatible version of xflsvg, compile it "
+                f"again: {self.path}"
+            )
+
+        return index_offset, index_length
+
+    def _load(self, offset, length):
+        return marshal.loads(self._view[offset : offset + length])
+
+    def exists(self, name):
+        return name in self._members
+
+    def parse(self, name):
+        """Get the tree of a member XML file. <DOMShape>s only have their
+        attributes and their matrix and color, see get_shapes."""
+        tree_offset, tree_length, _, _, _ = self._members[name]
+        return unpack_element(self._load(tree_offset, tree_length))
+
+    def get_frame_count(self, name):
+        """Get the number of frames in a LIBRARY asset's timeline."""
+        return self._members[name][2]
+
+    def get_shapes(self, name):
+        """Get the shapes of a member XML file.
+
+        Returns {(timeline name, layer index, frame index, element path):
+        StoredShape}, keyed like _get_xfl_shapes.
+        """
+        _, _, _, shapes_offset, shapes_length = self._members[name]
+        return {
+            key: StoredShape(self, location)
+            for key, location in self._load(shapes_offset, shapes_length).items()
+        }
+
+    def names(self):
+        return sorted(self._members)
+
+    def close(self):
+        # Stored shapes can't be loaded once the file is closed
+        self._view.release()
+        self._mmap.close()
+
+
+def write_compiled_xfl(output_path, xfl_id, members):
+    """Write a compiled XFL file.
+
+    Args:
+        output_path: Where to write the file
+        xfl_id: ID of the original XFL document
+        members: Iterable of (name, tree, frame count, shapes). tree is the
+            member's root element packed by pack_element with
+            skip_shape_content=True. shapes is {shape key: (<DOMShape> packed
+            by pack_element, normal SVG)}, keyed like _get_xfl_shapes.
+    """
+    index = {"id": xfl_id, "members": {}}
+
+    with open(output_path, "wb") as output:
+        output.write(COMPILED_XFL_MAGIC)
+        output.write(_COMPILED_XFL_HEADER.pack(CACHE_FORMAT_VERSION, 0, 0))
+
+        def write(data):
+            offset = output.tell()
+            output.write(data)
+            return offset, len(data)
+
+        for name, tree, frame_count, shapes in members:
+            tree_location = write(marshal.dumps(tree))
+
+            shape_locations = {}
+            for key, (domshape, normal_svg) in shapes.items():
+                shape_locations[key] = (
+                    *write(marshal.dumps(domshape)),
+                    *write(pickle.dumps(normal_svg, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+
+            index["members"][name] = (
+                *tree_location,
+                frame_count,
+                *write(marshal.dumps(shape_locations)),
+            )
+
+        index_offset, index_length = write(marshal.dumps(index))
+
+        output.seek(len(COMPILED_XFL_MAGIC))
+        output.write(
+            _COMPILED_XFL_HEADER.pack(CACHE_FORMAT_VERSION, index_offset, index_length)
+        )
+
+
+def open_xfl(path):
+    """Open an XFL directory, an FLA file or a compiled XFL file.
+
+    FLA files can also be given as open binary file objects. Compiled XFL
+    files contain pickled data, so only open ones from trusted sources. The
+    result should be closed when it's no longer needed.
+    """
+    if not isinstance(path, (str, os.PathLike)):
+        return XflZip(path)
+
+    if os.path.isdir(path):
+        return XflDirectory(path)
+
+    with open(path, "rb") as xfl_file:
+        magic = xfl_file.read(len(COMPILED_XFL_MAGIC))
+
+    # Compare without the format byte, so outdated files get a clear error
+    if magic[:-1] == COMPILED_XFL_MAGIC[:-1]:
+        return CompiledXfl(path)
+
+    if zipfile.is_zipfile(path):
+        return XflZip(path)
+
+    raise Exception(f"Unrecognized XFL file: {path}")
@@ -0,0 +1,345 @@
+"""
+Export frames as flat lists of world-space paths.
+
+SvgRenderer mirrors the frame tree with nested <g transform> and color
+filters. flatten_frame instead applies each shape's world transform to its
+path points and bakes its composed color into its fill and stroke colors, so
+every path can be drawn on its own.
+"""
+
+from dataclasses import dataclass
+import weakref
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .domshape.edge import (
+    LINE,
+    MOVE,
+    QUAD_CONTROL,
+    QUAD_END,
+    edge_attributes_to_point_lists,
+    format_number,
+)
+from .domshape.gradient import LinearGradient
+from .domshape.style import StyleTable, parse_solid_color
+from .transforms import get_world_transforms
+
+_MASK_STYLE = {"fill": "#FFFFFF", "stroke": "none"}
+
+# Coordinates, alphas and stroke widths are rounded to this many decimal places
+_PRECISION = 3
+
+
+@dataclass
+class FlatPath:
+    """A filled or stroked path in world space.
+
+    Attributes:
+        kind: "fill" or "stroke"
+        points: (m, 2) float64 array of world-space points
+        commands: (m,) uint8 array with the command of each point: MOVE,
+            LINE, QUAD_CONTROL or QUAD_END
+        style: SVG presentation attributes, with the shape's color transform
+            already applied
+        mask: Index into FlatFrame.masks of the mask that clips this path, or
+            None
+    """
+
+    kind: str
+    points: np.ndarray
+    commands: np.ndarray
+    style: dict
+    mask: int = None
+
+    def to_path_data(self):
+        """Convert the path to the SVG path format."""
+        result = []
+        last_command = None
+        for (x, y), command in zip(self.points.tolist(), self.commands.tolist()):
+            if command == MOVE:
+                result.append("M")
+            elif command == LINE and last_command != LINE:
+                result.append("L")
+            elif command == QUAD_CONTROL and last_command != QUAD_END:
+                result.append("Q")
+
+            result.append(
+                f"{format_number(x, _PRECISION)} {format_number(y, _PRECISION)}"
+            )
+            last_command = command
+
+        return " ".join(result)
+
+
+@dataclass
+class FlatFrame:
+    """A frame as flat lists of world-space paths.
+
+    Attributes:
+        paths: The frame's visible FlatPaths, in drawing order
+        masks: One list of FlatPaths for each mask layer. Masks use the
+            same white fill as SvgRenderer's masks.
+        defs: {id: SVG element} for the gradients referenced by styles
+    """
+
+    paths: list
+    masks: list
+    defs: dict
+
+    def to_svg(self, width, height):
+        """Create a flat SVG, with one <path> per FlatPath and no groups."""
+        svg = ET.Element(
+            "svg",
+            {
+                "xmlns": "http://www.w3.org/2000/svg",
+                "version": "1.1",
+                "width": f"{width}px",
+                "height": f"{height}px",
+                "viewBox": f"0 0 {width} {height}",
+            },
+        )
+
+        defs_element = ET.SubElement(svg, "defs")
+        defs_element.extend(self.defs.values())
+        for index, mask_paths in enumerate(self.masks):
+            mask_element = ET.SubElement(defs_element, "mask", {"id": f"Mask_{index}"})
+            mask_element.extend(_path_to_svg(path) for path in mask_paths)
+
+        svg.extend(_path_to_svg(path) for path in self.paths)
+        return ET.ElementTree(svg)
+
+
+@dataclass
+class _LocalPath:
+    kind: str
+    style_id: str
+    points: np.ndarray
+    commands: np.ndarray
+
+
+# {ShapeFrame: ([_LocalPath, ...], {fill id: style}, {stroke id: style})}
+_shape_paths = weakref.WeakKeyDictionary()
+
+
+def _point_lists_to_arrays(point_lists):
+    points = []
+    commands = []
+    for point_list in point_lists:
+        command = MOVE
+        for point in point_list:
+            if len(point) == 1:
+                points.append(point[0])
+                commands.append(QUAD_CONTROL)
+                command = QUAD_END
+                continue
+
+            points.append(point)
+            commands.append(command)
+            command = LINE
+
+    return (
+        np.array(points, dtype=np.float64).reshape(-1, 2),
+        np.array(commands, dtype=np.uint8),
+    )
+
+
+def _get_shape_paths(shape_frame):
+    """Get a ShapeFrame's paths in shape coordinates. The result is cached."""
+    result = _shape_paths.get(shape_frame)
+    if result is not None:
+        return result
+
+    record = shape_frame.shape_record
+    shapes, stroke_point_lists = edge_attributes_to_point_lists(record.edges)
+
+    paths = []
+    for fill_id, point_lists in shapes.items():
+        paths.append(_LocalPath("fill", fill_id, *_point_lists_to_arrays(point_lists)))
+    for stroke_id, point_lists in stroke_point_lists.items():
+        paths.append(
+            _LocalPath("stroke", stroke_id, *_point_lists_to_arrays(point_lists))
+        )
+
+    result = paths, dict(record.fill_styles), dict(record.stroke_styles)
+    _shape_paths[shape_frame] = result
+    return result
+
+
+def _apply_color(color, alpha, color_transform):
+    """Apply a composed color transform to a hex color and an optional alpha.
+
+    Args:
+        color_transform: ([mr, mg, mb, ma], [dr, dg, db, da]), or None for
+            no transform
+
+    Returns the new color and alpha as SVG attribute values.
+    """
+    if color_transform is None:
+        return color, alpha
+
+    rgba = (
+        int(color[1:3], 16) / 255,
+        int(color[3:5], 16) / 255,
+        int(color[5:7], 16) / 255,
+        1.0 if alpha is None else float(alpha),
+    )
+    r, g, b, a = (
+        min(max(value * multiplier + offset, 0.0), 1.0)
+        for value, multiplier, offset in zip(rgba, *color_transform)
+    )
+    new_color = f"#{round(r * 255):02X}{round(g * 255):02X}{round(b * 255):02X}"
+    return new_color, format_number(a, _PRECISION)
+
+
+def _get_fill_style(style, matrix, color_transform, defs, styles):
+    if style.tag.endswith("SolidColor"):
+        color, alpha = _apply_color(*parse_solid_color(style), color_transform)
+        result = {"fill": color, "stroke": "none"}
+        if alpha is not None:
+            result["fill-opacity"] = alpha
+        return result
+
+    if style.tag.endswith("LinearGradient"):
+        gradient = LinearGradient.from_xfl(style)
+        stops = []
+        for offset, color, alpha in gradient.stops:
+            stops.append((offset, *_apply_color(color, alpha, color_transform)))
+        gradient = LinearGradient(
+            gradient.start, gradient.end, tuple(stops), gradient.spread_method
+        )
+
+        # The gradient is in shape coordinates, so it needs the shape's
+        # transform. An affine transform of a linear gradient isn't always a
+        # linear gradient between the transformed end points, so SVG's
+        # gradientTransform is used instead of moving the end points.
+        gradient_element = gradient.to_svg()
+        gradient_id = f"{gradient.id}_{len(defs)}"
+        gradient_element.set("id", gradient_id)
+        a, c, tx, b, d, ty = matrix[:2].ravel().tolist()
+        transform = " ".join(format_number(v) for v in (a, b, c, d, tx, ty))
+        gradient_element.set("gradientTransform", f"matrix({transform})")
+        defs[gradient_id] = gradient_element
+        return {"fill": f"url(#{gradient_id})", "stroke": "none"}
+
+    attrib, _ = styles.get_fill_style(style)
+    return dict(attrib)
+
+
+def _get_stroke_style(style, scale, color_transform, styles):
+    result = dict(styles.get_stroke_style(style))
+
+    # Baking the transform into the points doesn't scale the stroke width, so
+    # scale it by the transform's average scale factor.
+    if "stroke-width" in result:
+        result["stroke-width"] = format_number(
+            float(result["stroke-width"]) * scale, _PRECISION
+        )
+
+    if "stroke" in result:
+        color, alpha = _apply_color(
+            result["stroke"], result.get("stroke-opacity"), color_transform
+        )
+        result["stroke"] = color
+        if alpha is not None:
+            result["stroke-opacity"] = alpha
+
+    return result
+
+
+def _path_to_svg(path):
+    element = ET.Element("path", path.style)
+    if path.mask is not None:
+        element.set("mask", f"url(#Mask_{path.mask})")
+    element.set("d", path.to_path_data())
+    return element
+
+
+def flatten_frame(frame):
+    """Convert a frame into a FlatFrame of world-space paths.
+
+    All of the frame's points are transformed in one batched NumPy operation.
+    A path clipped by nested masks only records the innermost one.
+    """
+    world = get_world_transforms(frame)
+    styles = StyleTable()
+
+    # Collect every path of every shape instance, then transform all of their
+    # points at once.
+    instances = []
+    all_points = []
+    point_counts = []
+    for index, shape_frame in enumerate(world.shapes):
+        paths, fill_styles, stroke_styles = _get_shape_paths(shape_frame)
+        for path in paths:
+            instances.append((index, path, fill_styles, stroke_styles))
+            all_points.append(path.points)
+            point_counts.append(len(path.points))
+
+    if all_points:
+        point_instances = np.repeat([index for index, *_ in instances], point_counts)
+        matrices = world.matrices[point_instances]
+        all_points = (
+            np.einsum("nij,nj->ni", matrices[:, :2, :2], np.concatenate(all_points))
+            + matrices[:, :2, 2]
+        )
+
+    # Per-shape values that are cheaper to compute for all shapes at once
+    matrices = world.matrices
+    scales = np.sqrt(
+        np.abs(
+            matrices[:, 0, 0] * matrices[:, 1, 1]
+            - matrices[:, 0, 1] * matrices[:, 1, 0]
+        )
+    ).tolist()
+    has_color = (
+        (world.color_multipliers != 1).any(axis=1)
+        | (world.color_offsets != 0).any(axis=1)
+    ).tolist()
+    multipliers = world.color_multipliers.tolist()
+    offsets = world.color_offsets.tolist()
+    masked = world.masked.tolist()
+    mask_indices = world.mask_indices.tolist()
+
+    mask_count = max(mask_indices, default=-1) + 1
+    result = FlatFrame(paths=[], masks=[[] for _ in range(mask_count)], defs={})
+
+    start = 0
+    for index, path, fill_styles, stroke_styles in instances:
+        end = start + len(path.points)
+        points = all_points[start:end]
+        start = end
+
+        if masked[index]:
+            # Same as SvgRenderer: no color transforms and white fills
+            if path.kind == "fill":
+                style = dict(_MASK_STYLE)
+            else:
+                style = _get_stroke_style(
+                    stroke_styles[path.style_id], scales[index], None, styles
+                )
+            flat_path = FlatPath(path.kind, points, path.commands, style)
+            result.masks[mask_indices[index]].append(flat_path)
+            continue
+
+        color_transform = None
+        if has_color[index]:
+            color_transform = multipliers[index], offsets[index]
+
+        if path.kind == "fill":
+            style = _get_fill_style(
+                fill_styles[path.style_id],
+                matrices[index],
+                color_transform,
+                result.defs,
+                styles,
+            )
+        else:
+            style = _get_stroke_style(
+                stroke_styles[path.style_id], scales[index], color_transform, styles
+            )
+
+        mask = mask_indices[index] if mask_indices[index] >= 0 else None
+        result.paths.append(FlatPath(path.kind, points, path.commands, style, mask))
+
+    return result
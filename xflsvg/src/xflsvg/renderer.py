@@ -1,13 +1,23 @@
 from numpy.lib.twodim_base import mask_indices
+from .domshape.edge import format_number
 from .xflsvg import Frame
-from .xflsvg import XflReader, XflRenderer, Layer
+from .xflsvg import XflReader, XflRenderer, Layer, IDENTITY_MATRIX
 import pandas
 from contextlib import contextmanager
 import threading
 import xml.etree.ElementTree as ET
 
 _EMPTY_SVG = '<svg height="1px" width="1px" viewBox="0 0 1 1" />'
-_IDENTITY_MATRIX = ["1", "0", "0", "1", "0", "0"]
+
+
+def _with_id(element, id):
+    """Copy an element with a new id. Converted shapes can be shared by several
+    ShapeFrames, so their elements are never modified. The children are shared
+    with the original."""
+    result = ET.Element(element.tag, element.attrib)
+    result.set("id", id)
+    result.extend(element)
+    return result
 
 
 def _color_to_svg_filter(color):
@@ -61,6 +71,15 @@ class SvgRenderer(XflRenderer):
         self.mask_depth = 0
         self.cache = {}
 
+        # {frame: number used in its def IDs}. Frame identifiers are only
+        # unique within one XflReader, so they can't name defs when frames
+        # from several readers are rendered together.
+        self._def_numbers = {}
+
+    def _def_id(self, prefix, frame):
+        number = self._def_numbers.setdefault(frame, len(self._def_numbers))
+        return f"{prefix}{number}"
+
     def render_shape(self, shape_snapshot, *args, **kwargs):
         if self.mask_depth == 0:
             fill_g, stroke_g, extra_defs = shape_snapshot.normal_svg
@@ -68,20 +87,18 @@ class SvgRenderer(XflRenderer):
             fill_g, stroke_g, extra_defs = shape_snapshot.mask_svg
 
         self.defs.update(extra_defs)
-        id = f"Shape{shape_snapshot.identifier}"
+        id = self._def_id("Shape", shape_snapshot)
 
         if fill_g is not None:
             fill_id = f"{id}_FILL"
-            fill_g.set("id", fill_id)
-            self.defs[fill_id] = fill_g
+            self.defs[fill_id] = _with_id(fill_g, fill_id)
 
             fill_use = ET.Element("use", {SvgRenderer.HREF: "#" + fill_id})
             self.context[-1].append(fill_use)
 
         if stroke_g is not None:
             stroke_id = f"{id}_STROKE"
-            stroke_g.set("id", stroke_id)
-            self.defs[stroke_id] = stroke_g
+            self.defs[stroke_id] = _with_id(stroke_g, stroke_id)
 
             self.context[-1].append(
                 ET.Element("use", {SvgRenderer.HREF: "#" + stroke_id})
@@ -94,9 +111,9 @@ class SvgRenderer(XflRenderer):
         transform_data = {}
         if (
             transformed_snapshot.matrix
-            and transformed_snapshot.matrix != _IDENTITY_MATRIX
+            and transformed_snapshot.matrix != IDENTITY_MATRIX
         ):
-            matrix = " ".join(transformed_snapshot.matrix)
+            matrix = " ".join(map(format_number, transformed_snapshot.matrix))
             transform_data["transform"] = f"matrix({matrix})"
 
         if self.mask_depth == 0:
@@ -119,7 +136,7 @@ class SvgRenderer(XflRenderer):
         self.context.append([])
 
     def pop_mask(self, masked_snapshot, *args, **kwargs):
-        mask_id = f"Mask_{masked_snapshot.identifier}"
+        mask_id = self._def_id("Mask_", masked_snapshot)
         mask_element = ET.Element("mask", {"id": mask_id})
         mask_element.extend(self.context.pop())
 
@@ -0,0 +1,225 @@
+"""
+Export frames as fixed-size quadratic Bézier tensors.
+
+Each visible path of a frame becomes one row of a (num_paths, max_segments,
+3, 2) array of (start, control, end) points in frame coordinates. Lines are
+stored as quadratic curves with their control point at the midpoint. Rows
+are padded to max_segments, and segment_mask marks which entries are real.
+
+The paths come from flatten_frame, so they're built from the same
+edge_format_to_point_lists and point_lists_to_shapes output as SvgRenderer's
+paths, with world transforms and colors already applied. Masks aren't
+applied: a clipped path is exported whole.
+"""
+
+import os
+
+import numpy as np
+
+from .flatten import LINE, QUAD_END, flatten_frame
+
+# Arrays exported for each path, and their dtypes
+TENSOR_FIELDS = {
+    "segments": np.float32,
+    "segment_mask": np.bool_,
+    "segment_counts": np.int32,
+    "fill_colors": np.float32,
+    "stroke_colors": np.float32,
+    "stroke_widths": np.float32,
+}
+
+_NO_COLOR = (0.0, 0.0, 0.0, 0.0)
+
+
+def _parse_color(color, opacity):
+    """Convert a hex color and an optional opacity into RGBA in [0, 1]."""
+    return (
+        int(color[1:3], 16) / 255,
+        int(color[3:5], 16) / 255,
+        int(color[5:7], 16) / 255,
+        1.0 if opacity is None else float(opacity),
+    )
+
+
+def _get_paint(style, paint, defs):
+    """Get the RGBA color of a path's fill or stroke.
+
+    Gradients are reduced to the mean of their stop colors.
+    """
+    value = style.get(paint, "none")
+    if value.startswith("#"):
+        return _parse_color(value, style.get(f"{paint}-opacity"))
+
+    if value.startswith("url(#") and value[5:-1] in defs:
+        stops = [
+            _parse_color(stop.get("stop-color"), stop.get("stop-opacity"))
+            for stop in defs[value[5:-1]].iter("stop")
+        ]
+        if stops:
+            return tuple(np.mean(stops, axis=0).tolist())
+
+    return _NO_COLOR
+
+
+def _paths_to_segments(paths):
+    """Convert FlatPaths into quadratic segments.
+
+    Returns a tuple:
+        segments: (k, 3, 2) float64 array of (start, control, end) points
+        segment_paths: (k,) array with the index of each segment's path
+    """
+    if not paths:
+        return np.zeros((0, 3, 2)), np.zeros(0, dtype=np.intp)
+
+    points = np.concatenate([path.points for path in paths])
+    commands = np.concatenate([path.commands for path in paths])
+    point_paths = np.repeat(np.arange(len(paths)), [len(p.points) for p in paths])
+
+    # Every LINE or QUAD_END point ends a segment. A line starts at the point
+    # before it, and a curve starts at the point before its control point.
+    ends = np.flatnonzero((commands == LINE) | (commands == QUAD_END))
+    is_quad = commands[ends] == QUAD_END
+    starts = ends - 1 - is_quad
+
+    controls = (points[starts] + points[ends]) / 2
+    controls[is_quad] = points[ends[is_quad] - 1]
+
+    segments = np.stack([points[starts], controls, points[ends]], axis=1)
+    return segments, point_paths[ends]
+
+
+def frame_to_tensors(frame, max_segments=None):
+    """Convert a frame's visible paths into fixed-size Bézier tensors.
+
+    Args:
+        frame: Frame to convert
+        max_segments: Number of segments per row. Longer paths are
+            truncated. Defaults to the length of the frame's longest path.
+
+    Returns a dict of arrays, with one row per path in drawing order:
+        segments: (num_paths, max_segments, 3, 2) (start, control, end)
+            points of each quadratic segment, zero-padded
+        segment_mask: (num_paths, max_segments) True for real segments
+        segment_counts: (num_paths,) number of segments in each path before
+            truncation
+        fill_colors: (num_paths, 4) RGBA fill, all zeros for strokes
+        stroke_colors: (num_paths, 4) RGBA stroke, all zeros for fills
+        stroke_widths: (num_paths,) stroke widths, zero for fills
+    """
+    flat_frame = flatten_frame(frame)
+    paths = flat_frame.paths
+    segments, segment_paths = _paths_to_segments(paths)
+
+    segment_counts = np.bincount(segment_paths, minlength=len(paths))
+    if max_segments is None:
+        max_segments = int(segment_counts.max(initial=0))
+
+    # Position of each segment within its path
+    path_starts = np.cumsum(segment_counts) - segment_counts
+    positions = np.arange(len(segments)) - path_starts[segment_paths]
+    keep = positions < max_segments
+
+    result = {
+        name: np.zeros(shape, dtype=TENSOR_FIELDS[name])
+        for name, shape in (
+            ("segments", (len(paths), max_segments, 3, 2)),
+            ("segment_mask", (len(paths), max_segments)),
+            ("fill_colors", (len(paths), 4)),
+            ("stroke_colors", (len(paths), 4)),
+            ("stroke_widths", (len(paths),)),
+        )
+    }
+    result["segments"][segment_paths[keep], positions[keep]] = segments[keep]
+    result["segment_mask"][segment_paths[keep], positions[keep]] = True
+    result["segment_counts"] = segment_counts.astype(TENSOR_FIELDS["segment_counts"])
+
+    for index, path in enumerate(paths):
+        if path.kind == "fill":
+            result["fill_colors"][index] = _get_paint(
+                path.style, "fill", flat_frame.defs
+            )
+        else:
+            result["stroke_colors"][index] = _get_paint(
+                path.style, "stroke", flat_frame.defs
+            )
+            result["stroke_widths"][index] = float(path.style.get("stroke-width", 0))
+
+    return result
+
+
+def _write_shard(output_dir, shard_index, batch, max_segments, format):
+    """Concatenate a batch of frame tensors and write them as one shard."""
+    if max_segments is None:
+        max_segments = max(tensors["segments"].shape[1] for tensors in batch)
+
+    shard = {}
+    for name in TENSOR_FIELDS:
+        arrays = []
+        for tensors in batch:
+            array = tensors[name]
+            if name in ("segments", "segment_mask"):
+                # Pad each frame's rows to the shard's row length
+                padding = [(0, 0)] * array.ndim
+                padding[1] = (0, max_segments - array.shape[1])
+                array = np.pad(array, padding)
+            arrays.append(array)
+        shard[name] = np.concatenate(arrays)
+
+    path_counts = [len(tensors["segments"]) for tensors in batch]
+    shard["frame_offsets"] = np.concatenate([[0], np.cumsum(path_counts)])
+
+    name = f"shard_{shard_index:05d}"
+    if format == "npz":
+        path = os.path.join(output_dir, f"{name}.npz")
+        np.savez(path, **shard)
+        return path
+
+    path = os.path.join(output_dir, name)
+    os.makedirs(path, exist_ok=True)
+    for array_name, array in shard.items():
+        np.save(os.path.join(path, f"{array_name}.npy"), array)
+    return path
+
+
+def export_tensor_shards(
+    frames, output_dir, frames_per_shard=256, max_segments=None, format="npy"
+):
+    """Convert a sequence of frames into Bézier tensors and write them in shards.
+
+    Each shard holds the arrays returned by frame_to_tensors for up to
+    frames_per_shard consecutive frames, concatenated along the path axis,
+    plus frame_offsets: paths of the shard's i-th frame are rows
+    frame_offsets[i] to frame_offsets[i + 1].
+
+    Args:
+        frames: Frames to export, e.g. XflReader.get_timeline()
+        output_dir: Directory to write the shards to
+        frames_per_shard: Number of frames in each shard
+        max_segments: Fixed number of segments per row. Defaults to the
+            longest path in each shard.
+        format: "npy" writes each shard as a directory with one .npy file
+            per array, which np.load(..., mmap_mode="r") can memory-map.
+            "npz" writes each shard as one uncompressed .npz file.
+
+    Returns a list of the shard paths.
+    """
+    if format not in ("npy", "npz"):
+        raise Exception(f"Unknown tensor shard format: {format}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    shard_paths = []
+    batch = []
+    for frame in frames:
+        batch.append(frame_to_tensors(frame, max_segments))
+        if len(batch) == frames_per_shard:
+            shard_paths.append(
+                _write_shard(output_dir, len(shard_paths), batch, max_segments, format)
+            )
+            batch = []
+
+    if batch:
+        shard_paths.append(
+            _write_shard(output_dir, len(shard_paths), batch, max_segments, format)
+        )
+
+    return shard_paths
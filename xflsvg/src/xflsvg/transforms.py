@@ -0,0 +1,160 @@
+"""
+World-space transforms and colors of the shapes in a frame.
+
+Renderers see each frame's local matrix and color through push_transform and
+pop_transform. Exporters that need absolute positions and colors can use
+get_world_transforms instead of walking the tree and composing them one node
+at a time.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .xflsvg import IDENTITY_MATRIX, ColorObject, MaskedFrame, ShapeFrame
+
+_NO_COLOR = (1.0, 1.0, 1.0, 1.0, 0.0, 0.0, 0.0, 0.0)
+
+
+@dataclass
+class WorldTransforms:
+    """The shapes drawn by a frame, with their composed transforms.
+
+    Shapes are listed in the order they're passed to render_shape. A shape
+    that appears several times in the tree is listed once per appearance.
+
+    Attributes:
+        shapes: ShapeFrame of each shape
+        matrices: (n, 3, 3) float64 array. Each matrix maps shape coordinates
+            to frame coordinates, the same way SVG's matrix(a b c d tx ty)
+            does.
+        color_multipliers: (n, 4) float64 array of the composed (mr, mg, mb, ma)
+        color_offsets: (n, 4) float64 array of the composed (dr, dg, db, da)
+        masked: (n,) bool array. True for shapes that are part of a mask
+            layer. SvgRenderer doesn't apply colors to those.
+        mask_indices: (n,) int array. For shapes in a mask layer, the index
+            of that MaskedFrame, counting MaskedFrames in render order. For
+            shapes that are clipped by a mask, the index of the innermost
+            MaskedFrame that clips them. -1 for every other shape.
+    """
+
+    shapes: list
+    matrices: np.ndarray
+    color_multipliers: np.ndarray
+    color_offsets: np.ndarray
+    masked: np.ndarray
+    mask_indices: np.ndarray
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def get_color(self, index):
+        """Get the composed color of a shape as a ColorObject."""
+        return ColorObject(
+            *self.color_multipliers[index].tolist(),
+            *self.color_offsets[index].tolist(),
+        )
+
+
+def _get_color_values(color):
+    if color is None:
+        return _NO_COLOR
+
+    return (
+        color.mr,
+        color.mg,
+        color.mb,
+        color.ma,
+        color.dr,
+        color.dg,
+        color.db,
+        color.da,
+    )
+
+
+def get_world_transforms(frame):
+    """Compute the world matrix and color of every shape drawn by a frame.
+
+    The tree is walked once to collect each node's local matrix and color.
+    They're then composed with NumPy one tree depth at a time, so composing
+    takes one batched operation per depth rather than one per node.
+    """
+    local_matrices = []
+    local_colors = []
+    parents = []
+    depths = []
+    shape_nodes = []
+    shapes = []
+    masked = []
+    mask_indices = []
+    mask_count = 0
+
+    # Walk the tree in render order: a MaskedFrame renders its mask first
+    stack = [(frame, -1, 0, False, -1)]
+    while stack:
+        frame, parent, depth, in_mask, mask_index = stack.pop()
+        node = len(parents)
+        parents.append(parent)
+        depths.append(depth)
+
+        if isinstance(frame, ShapeFrame):
+            # Renderers ignore a shape frame's own matrix and color
+            local_matrices.append(IDENTITY_MATRIX)
+            local_colors.append(_NO_COLOR)
+            shape_nodes.append(node)
+            shapes.append(frame)
+            masked.append(in_mask)
+            mask_indices.append(mask_index)
+            continue
+
+        if isinstance(frame, MaskedFrame):
+            local_matrices.append(IDENTITY_MATRIX)
+            local_colors.append(_NO_COLOR)
+            for child in reversed(frame.children):
+                stack.append((child, node, depth + 1, in_mask, mask_count))
+            stack.append((frame.mask, node, depth + 1, True, mask_count))
+            mask_count += 1
+            continue
+
+        local_matrices.append(frame.matrix or IDENTITY_MATRIX)
+        local_colors.append(_get_color_values(frame.color))
+        for child in reversed(frame.children):
+            stack.append((child, node, depth + 1, in_mask, mask_index))
+
+    node_count = len(parents)
+    abcdxy = np.array(local_matrices, dtype=np.float64).reshape(node_count, 6)
+    matrices = np.zeros((node_count, 3, 3))
+    matrices[:, 0, 0] = abcdxy[:, 0]
+    matrices[:, 1, 0] = abcdxy[:, 1]
+    matrices[:, 0, 1] = abcdxy[:, 2]
+    matrices[:, 1, 1] = abcdxy[:, 3]
+    matrices[:, 0, 2] = abcdxy[:, 4]
+    matrices[:, 1, 2] = abcdxy[:, 5]
+    matrices[:, 2, 2] = 1
+
+    colors = np.array(local_colors, dtype=np.float64).reshape(node_count, 8)
+    multipliers = colors[:, :4].copy()
+    offsets = colors[:, 4:].copy()
+
+    # Compose each depth with the already-composed depth above it
+    parents = np.array(parents, dtype=np.intp)
+    depths = np.array(depths, dtype=np.intp)
+    order = np.argsort(depths, kind="stable")
+    boundaries = np.searchsorted(depths[order], np.arange(1, depths.max() + 1))
+    for nodes in np.split(order, boundaries)[1:]:
+        parent_nodes = parents[nodes]
+        matrices[nodes] = matrices[parent_nodes] @ matrices[nodes]
+        # Same as ColorObject.__matmul__: parent @ child
+        offsets[nodes] = multipliers[parent_nodes] * offsets[nodes]
+        offsets[nodes] += offsets[parent_nodes]
+        multipliers[nodes] *= multipliers[parent_nodes]
+
+    shape_nodes = np.array(shape_nodes, dtype=np.intp)
+    return WorldTransforms(
+        shapes=shapes,
+        matrices=matrices[shape_nodes],
+        color_multipliers=multipliers[shape_nodes],
+        color_offsets=offsets[shape_nodes],
+        masked=np.array(masked, dtype=bool),
+        mask_indices=np.array(mask_indices, dtype=np.intp),
+    )
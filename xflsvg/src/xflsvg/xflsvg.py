@@ -2,7 +2,7 @@
 This class is for parsing and rendering XFL files.
 
 Example usage:
-    
+
     xfl = XflReader('/path/to/file.xfl')
     timeline = xfl.get_timeline('Scene 1')
     for i, frame in enumerate(timeline):
@@ -15,7 +15,7 @@ Example usage:
 Overview of XFL:
     An XFL file consists of a Document file and Asset files. A Document contains one or
     more timelines. An Asset contains a single timeline.
-    
+
     Each timeline contains one or more layers. Some layers are designated as mask
     layers, and some layers have parent mask layers. A mask layer, when rendered,
     defines which portion of child layers should get rendered. Layers are rendered
@@ -45,47 +45,77 @@ Overview of rendering:
 
     OR
         on_frame_rendered - Should handle Frame, ShapeFrame, and MaskedFrame
-    
+
     The first set of methods are better for actual rendering since they convert the XFL
     file into a sequence. The second method is better for transforming the data into a
     new tree-structured format.
 
 """
 
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from contextlib import contextmanager
 import copy
 from dataclasses import dataclass
+from functools import cached_property
 from glob import glob
+import hashlib
 import json
 import html
+import io
+import itertools
 import os
 import re
 import shutil
 import threading
 from typing import Sequence
 import warnings
+import weakref
 
-from bs4 import BeautifulSoup
 import xml.etree.ElementTree as etree
 
-from .domshape import xfl_domshape_to_svg
+from .cache import LruCache, ShapeDiskCache
+from .domshape import DOMShapeRecord, xfl_domshape_to_svg, xfl_domshapes_to_svg
+from .domshape.style import StyleTable
+from .files import DOCUMENT_NAME, open_xfl, pack_element, write_compiled_xfl
 from .easing import *
 
-_frame_index = 0
+# Identifiers for frames that aren't created by an XflReader
+_frame_identifiers = itertools.count()
 
 
 class Frame:
-    def __init__(self, matrix=None, color=None, children=None):
-        global _frame_index
-        self.identifier = _frame_index
-        _frame_index += 1
-
+    __slots__ = (
+        "identifier",
+        "matrix",
+        "color",
+        "owner_element",
+        "parent_frame",
+        "frame_index",
+        "children",
+        "_program",
+        "__weakref__",
+    )
+
+    def __init__(self, matrix=None, color=None, children=None, identifier=None):
+        """
+        Args:
+            identifier: ID of the frame. Frames created by an XflReader get
+                identifiers from XflReader.new_frame_identifier, which are
+                only unique within that reader. Others get one from a
+                process-wide counter.
+        """
+        if identifier is None:
+            identifier = next(_frame_identifiers)
+
+        self.identifier = identifier
         self.matrix = matrix
         self.color = color
         self.owner_element = None
         self.parent_frame = None
         self.frame_index = -1
         self.children = []
+        self._program = None
 
     def add_child(self, child_frame):
         self.children.append(child_frame)
@@ -96,53 +126,213 @@ class Frame:
         child_frame.parent_frame = self
 
     def render(self, *args, **kwargs):
-        renderer = XflRenderer.current()
-        renderer.push_transform(self, *args, **kwargs)
+        """Render this frame's tree with the current XflRenderer.
+
+        The tree is walked with an explicit stack rather than recursion, so
+        deeply nested symbols don't hit Python's recursion limit. The renderer
+        sees the same hook calls as a depth-first recursive walk:
+            Frame: push_transform, children, pop_transform, on_frame_rendered
+            ShapeFrame: render_shape, on_frame_rendered
+            MaskedFrame: push_mask, mask, pop_mask, push_masked_render,
+                children, pop_masked_render, on_frame_rendered
+        """
+        hooks = XflRenderer.current().get_overridden_hooks()
+        hooks["render"] = _render_frame
+        _make_render_calls(_iter_render_calls(self), hooks, args, kwargs)
+
+    def compile(self):
+        """Flatten this frame's tree into a RenderProgram.
+
+        The program is cached on the frame, so only call this once the frame's
+        tree is complete. Frames returned by an XflReader always are.
+        """
+        if self._program is None:
+            self._program = RenderProgram(self)
+        return self._program
 
-        for child in self.children:
-            child.render(*args, **kwargs)
 
-        renderer.pop_transform(self, *args, **kwargs)
-        renderer.on_frame_rendered(self, *args, **kwargs)
+class ShapeFrame(Frame):
+    """A frame that draws a single XFL shape.
+
+    The shape is converted to SVG the first time normal_svg or mask_svg is
+    used, and the result is cached. Most shapes are never drawn inside a mask,
+    so most mask_svgs are never built. With a shape_cache, shapes with the same
+    content share one conversion. path_options and styles (a StyleTable) are
+    passed on to xfl_domshape_to_svg.
+
+    Shapes from compiled XFL files come with a StoredShape, and domshape is
+    None. Its converted SVG is used as the normal SVG unless there are
+    path_options, and its <DOMShape> is only loaded if the shape needs to be
+    converted.
+    """
+
+    __slots__ = (
+        "stored_shape",
+        "shape_cache",
+        "path_options",
+        "styles",
+        "_domshape",
+        "_shape_record",
+        "_normal_svg",
+        "_mask_svg",
+    )
 
+    def __init__(
+        self,
+        domshape,
+        normal_svg=None,
+        identifier=None,
+        shape_cache=None,
+        path_options=None,
+        stored_shape=None,
+        styles=None,
+    ):
+        super().__init__(identifier=identifier)
+        self.stored_shape = stored_shape
+        self.shape_cache = shape_cache
+        self.path_options = path_options or {}
+        self.styles = styles
+        self._domshape = domshape
+        self._shape_record = None
+        self._normal_svg = normal_svg
+        self._mask_svg = None
 
-class ShapeFrame(Frame):
-    def __init__(self, normal_svg, mask_svg):
-        super().__init__()
-        self.normal_svg = normal_svg
-        self.mask_svg = mask_svg
+    @property
+    def domshape(self):
+        if self._domshape is None:
+            self._domshape = self.stored_shape.domshape
+        return self._domshape
 
-    def render(self, *args, **kwargs):
-        renderer = XflRenderer.current()
-        renderer.render_shape(self, *args, **kwargs)
-        renderer.on_frame_rendered(self, *args, **kwargs)
+    @property
+    def shape_record(self):
+        if self._shape_record is None:
+            self._shape_record = DOMShapeRecord.from_xfl(self.domshape)
+        return self._shape_record
+
+    @property
+    def normal_svg(self):
+        if self._normal_svg is None:
+            if self.stored_shape is not None and not self.path_options:
+                self._normal_svg = self.stored_shape.normal_svg
+            else:
+                self._normal_svg = self._convert(False)
+        return self._normal_svg
+
+    @property
+    def mask_svg(self):
+        if self._mask_svg is None:
+            self._mask_svg = self._convert(True)
+        return self._mask_svg
+
+    def _convert(self, mask):
+        if self.shape_cache is not None:
+            return self.shape_cache.convert(
+                self.shape_record, mask, styles=self.styles, **self.path_options
+            )
+        return xfl_domshape_to_svg(
+            self.shape_record, mask, styles=self.styles, **self.path_options
+        )
 
 
-def _transformed_frame(original, matrix=None, color=None):
-    result = Frame(matrix, color)
+def _transformed_frame(original, matrix=None, color=None, identifier=None):
+    result = Frame(matrix, color, identifier=identifier)
     result.add_child(original)
     return result
 
 
 class MaskedFrame(Frame):
-    def __init__(self, mask):
-        super().__init__()
+    __slots__ = ("mask",)
+
+    def __init__(self, mask, identifier=None):
+        super().__init__(identifier=identifier)
         self.mask = mask
         mask.parent_frame = self
 
-    def render(self, *args, **kwargs):
-        renderer = XflRenderer.current()
 
-        renderer.push_mask(self, *args, **kwargs)
-        self.mask.render()
-        renderer.pop_mask(self, *args, **kwargs)
+def _iter_render_calls(frame):
+    """Yield the renderer hook calls that frame.render() makes, in order.
+
+    Each call is a (hook name, frame, pass_args) tuple. pass_args is False for
+    calls that are made without render()'s arguments. That happens for
+    everything under a MaskedFrame: its mask and children are rendered with
+    no arguments. A frame whose class overrides render() is yielded as a
+    single "render" call.
+    """
+    # Entries with a hook name of None are frames that still need expanding
+    stack = [(None, frame, True)]
+
+    while stack:
+        hook_name, frame, pass_args = stack.pop()
+        if hook_name is not None:
+            yield hook_name, frame, pass_args
+            continue
+
+        if type(frame).render is not Frame.render:
+            yield "render", frame, pass_args
+
+        elif isinstance(frame, ShapeFrame):
+            yield "render_shape", frame, pass_args
+            yield "on_frame_rendered", frame, pass_args
+
+        elif isinstance(frame, MaskedFrame):
+            yield "push_mask", frame, pass_args
+            stack.append(("on_frame_rendered", frame, pass_args))
+            stack.append(("pop_masked_render", frame, pass_args))
+            for child in reversed(frame.children):
+                stack.append((None, child, False))
+            stack.append(("push_masked_render", frame, pass_args))
+            stack.append(("pop_mask", frame, pass_args))
+            stack.append((None, frame.mask, False))
+
+        else:
+            yield "push_transform", frame, pass_args
+            stack.append(("on_frame_rendered", frame, pass_args))
+            stack.append(("pop_transform", frame, pass_args))
+            for child in reversed(frame.children):
+                stack.append((None, child, pass_args))
+
+
+def _render_frame(frame, *args, **kwargs):
+    frame.render(*args, **kwargs)
+
+
+def _make_render_calls(calls, hooks, args, kwargs):
+    """Make calls from _iter_render_calls using {hook name: function}.
+
+    Calls to hooks that aren't in hooks are skipped.
+    """
+    for hook_name, frame, pass_args in calls:
+        hook = hooks.get(hook_name)
+        if hook is None:
+            continue
+
+        if pass_args:
+            hook(frame, *args, **kwargs)
+        else:
+            hook(frame)
+
+
+class RenderProgram:
+    """A frame tree flattened into the renderer hook calls that rendering it
+    makes.
+
+    Replaying a program makes the same calls as frame.render(), in the same
+    order, without walking the tree. Calls to hooks that the current renderer
+    doesn't override are skipped.
+    """
+
+    __slots__ = ("calls",)
+
+    def __init__(self, frame):
+        self.calls = tuple(_iter_render_calls(frame))
 
-        renderer.push_masked_render(self, *args, **kwargs)
-        for child in self.children:
-            child.render()
-        renderer.pop_masked_render(self, *args, **kwargs)
+    def __len__(self):
+        return len(self.calls)
 
-        renderer.on_frame_rendered(self, *args, **kwargs)
+    def replay(self, *args, **kwargs):
+        hooks = XflRenderer.current().get_overridden_hooks()
+        hooks["render"] = _render_frame
+        _make_render_calls(self.calls, hooks, args, kwargs)
 
 
 class AnimationObject(Sequence):
@@ -195,46 +385,67 @@ class ColorObject:
             and self.da == 0
         )
 
-    @property
+    @cached_property
     def id(self):
-        """Unique ID used to dedup SVG elements in <defs>."""
-        return f"Filter_{hash(self) & 0xFFFFFFFFFFFFFFFF:16x}"
+        """Unique ID used to dedup SVG elements in <defs>.
+
+        The ID is a digest of the color values, so it's the same in every
+        process.
+        """
+        values = (
+            self.mr,
+            self.mg,
+            self.mb,
+            self.ma,
+            self.dr,
+            self.dg,
+            self.db,
+            self.da,
+        )
+        digest = hashlib.blake2b(
+            repr(tuple(map(float, values))).encode(), digest_size=8
+        )
+        return f"Filter_{digest.hexdigest()}"
+
+
+def _tag_name(xmlnode):
+    """Get the tag of an XFL element without its XML namespace."""
+    return xmlnode.tag.rpartition("}")[2]
+
+
+IDENTITY_MATRIX = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
 
 
 def _get_matrix(xmlnode):
-    outer = xmlnode.findChild("matrix", recursive=False)
-    if outer == None:
-        return None
+    """Get an element's matrix as a tuple of floats (a, b, c, d, tx, ty).
 
-    inner = outer.findChild("Matrix", recursive=False)
-    if inner == None:
+    Returns None for the identity matrix.
+    """
+    inner = xmlnode.find("{*}matrix/{*}Matrix")
+    if inner is None:
         return None
 
-    result = [
-        inner.get("a", default="1"),
-        inner.get("b", default="0"),
-        inner.get("c", default="0"),
-        inner.get("d", default="1"),
-        inner.get("tx", default="0"),
-        inner.get("ty", default="0"),
-    ]
+    result = (
+        float(inner.get("a", default=1)),
+        float(inner.get("b", default=0)),
+        float(inner.get("c", default=0)),
+        float(inner.get("d", default=1)),
+        float(inner.get("tx", default=0)),
+        float(inner.get("ty", default=0)),
+    )
 
-    if result == ["1", "0", "0", "1", "0", "0"]:
+    if result == IDENTITY_MATRIX:
         return None
 
     return result
 
 
 def _get_color(xmlnode):
-    outer = xmlnode.findChild("color", recursive=False)
-    if outer == None:
-        return None
-
-    inner = outer.findChild("Color", recursive=False)
-    if inner == None:
+    inner = xmlnode.find("{*}color/{*}Color")
+    if inner is None:
         return None
 
-    inner = inner.attrs
+    inner = inner.attrib
     result = None
 
     count = 0
@@ -299,19 +510,190 @@ def _get_color(xmlnode):
     return result
 
 
+def _scan_frame_count(xml_file):
+    """Get the length of an asset's timeline without building the asset.
+
+    Only the index and duration attributes of <DOMFrame>s are read. Each
+    <DOMFrame> is discarded as soon as it's parsed, so memory use stays small
+    no matter how large the asset is.
+    """
+    frame_count = 0
+    for _, xmlnode in etree.iterparse(xml_file):
+        if _tag_name(xmlnode) == "DOMFrame":
+            end_frame_index = int(xmlnode.get("index")) + int(
+                xmlnode.get("duration", default=1)
+            )
+            frame_count = max(frame_count, end_frame_index)
+            xmlnode.clear()
+
+    return frame_count
+
+
+def _iter_element_shapes(xmlnodes, path):
+    for i, xmlnode in enumerate(xmlnodes):
+        element_type = _tag_name(xmlnode)
+        if element_type == "DOMShape":
+            yield (*path, i), xmlnode
+        elif element_type == "DOMGroup":
+            yield from _iter_element_shapes(xmlnode.find("{*}members"), (*path, i))
+
+
+def _iter_timeline_shapes(timeline):
+    """Yield every <DOMShape> in a <DOMTimeline>.
+
+    Yields:
+        ((layer index, frame index, element path), <DOMShape>), keyed the same
+        way as XflReader.get_shape
+    """
+    for layer_index, layer_xmlnode in enumerate(timeline.find("{*}layers")):
+        frames_xmlnode = layer_xmlnode.find("{*}frames")
+        if frames_xmlnode is None:
+            continue
+
+        for bundle_xmlnode in frames_xmlnode:
+            frame_index = int(bundle_xmlnode.get("index"))
+            elements = bundle_xmlnode.find("{*}elements")
+            for path, xmlnode in _iter_element_shapes(elements, ()):
+                yield (layer_index, frame_index, path), xmlnode
+
+
+def _get_library_references(xmlnode):
+    """Get the library item names of all symbols used under an XFL element."""
+    return {
+        symbol_xmlnode.get("libraryItemName")
+        for symbol_xmlnode in xmlnode.iterfind(".//{*}DOMSymbolInstance")
+    }
+
+
+def _get_xfl_shapes(
+    xml_bytes,
+    disk_cache=None,
+    xmlnode=None,
+    shape_cache=None,
+    precision=None,
+    relative=False,
+    styles=None,
+):
+    """Convert every shape in an XFL file.
+
+    Args:
+        xml_bytes: Contents of the XFL file
+        disk_cache: Optional ShapeDiskCache. If it has an entry for this file,
+            nothing is parsed or converted. Otherwise, a new entry is saved.
+        xmlnode: The parsed file, if it's already been parsed
+        shape_cache: Optional ShapeContentCache to convert shapes with
+        precision, relative: Path data format, see xfl_domshape_to_svg
+        styles: Optional StyleTable to parse styles with
+
+    Returns a tuple:
+        {(timeline name, layer index, frame index, element path): normal SVG}
+        Library item names referenced by the file
+    """
+    if disk_cache is not None:
+        cache_key = disk_cache.get_key(xml_bytes, precision, relative)
+        cached_result = disk_cache.load(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+    if xmlnode is None:
+        xmlnode = etree.fromstring(xml_bytes)
+
+    keys = []
+    records = []
+    for timeline in xmlnode.iterfind(".//{*}DOMTimeline"):
+        timeline_name = timeline.get("name")
+        for key, domshape in _iter_timeline_shapes(timeline):
+            keys.append((timeline_name, *key))
+            records.append(DOMShapeRecord.from_xfl(domshape))
+
+    # Converting all of the file's shapes in one call is faster than converting
+    # them one by one
+    if shape_cache is None:
+        svgs = xfl_domshapes_to_svg(
+            records, False, precision=precision, relative=relative, styles=styles
+        )
+    else:
+        svgs = shape_cache.convert_many(records, False, precision, relative, styles)
+    shapes = dict(zip(keys, svgs))
+
+    result = shapes, _get_library_references(xmlnode)
+
+    if disk_cache is not None:
+        disk_cache.save(cache_key, result)
+
+    return result
+
+
+def _compile_xfl_file(xml_bytes):
+    """Get what write_compiled_xfl stores for one XFL file.
+
+    Returns (tree, frame count, shapes), see write_compiled_xfl.
+    """
+    xmlnode = etree.fromstring(xml_bytes)
+    svgs, _ = _get_xfl_shapes(xml_bytes, xmlnode=xmlnode)
+
+    shapes = {}
+    for timeline in xmlnode.iterfind(".//{*}DOMTimeline"):
+        timeline_name = timeline.get("name")
+        for key, domshape in _iter_timeline_shapes(timeline):
+            key = (timeline_name, *key)
+            shapes[key] = (pack_element(domshape), svgs[key])
+
+    tree = pack_element(xmlnode, skip_shape_content=True)
+    return tree, _scan_frame_count(io.BytesIO(xml_bytes)), shapes
+
+
+def compile_xfl(xflsvg_dir, output_path, workers=None):
+    """Compile an XFL directory or FLA file into a single file that XflReader
+    can open.
+
+    The compiled file stores the parsed tree of every XML file of the directory,
+    so readers of the compiled file don't parse XML. Shapes are stored with
+    their converted SVGs, so readers of the compiled file never convert shapes.
+    Shapes are converted in a process pool. The SVGs are pickled, so only open
+    compiled files from trusted sources.
+
+    On Windows, this must be called under `if __name__ == "__main__":`.
+
+    Args:
+        xflsvg_dir: Directory containing DOMDocument.xml, or a .fla file
+        output_path: Where to write the compiled file
+        workers: Number of worker processes. Defaults to the CPU count.
+    """
+    with open_xfl(xflsvg_dir) as files:
+        if files.precompiled:
+            raise Exception(f"Already compiled: {xflsvg_dir}")
+
+        names = files.names()
+        contents = [files.read(name) for name in names]
+
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(_compile_xfl_file, contents, chunksize=16)
+        write_compiled_xfl(
+            output_path,
+            files.id,
+            ((name, *result) for name, result in zip(names, results)),
+        )
+
+
 class MotionTween:
     pass
 
 
 class Element(AnimationObject):
-    def __init__(self, xmlnode):
+    def __init__(self, xmlnode, xflsvg=None):
         super().__init__()
+        self.xflsvg = xflsvg
         self.xmlnode = xmlnode
         self.matrix = _get_matrix(xmlnode)
         self.color = _get_color(xmlnode)
 
     def __getitem__(self, k: int) -> Frame:
-        result = Frame()
+        identifier = None
+        if self.xflsvg is not None:
+            identifier = self.xflsvg.new_frame_identifier()
+
+        result = Frame(identifier=identifier)
         result.owner_element = self
         result.frame_index = k
         return result
@@ -319,35 +701,68 @@ class Element(AnimationObject):
 
 class SymbolElement(Element):
     def __init__(self, xflsvg, duration, xmlnode):
-        super().__init__(xmlnode)
-        self.xflsvg = xflsvg
+        super().__init__(xmlnode, xflsvg)
         self.loop_type = xmlnode.get("loop")
-        self.asset = xflsvg.get_safe_asset(xmlnode.get("libraryItemName"))
-        self.first_frame = (
-            int(xmlnode.get("firstFrame", default=0)) % self.asset.frame_count
-        )
-        self.last_frame = (
-            int(xmlnode.get("lastFrame", default=-1)) % self.asset.frame_count
-        )
+        self.safe_asset_id = xmlnode.get("libraryItemName")
+        self._first_frame = int(xmlnode.get("firstFrame", default=0))
+        self._last_frame = int(xmlnode.get("lastFrame", default=-1))
         self.duration = duration
 
+        # The loop math only needs the asset's frame count, which the reader
+        # can get without building the asset. In lazy mode, the asset itself
+        # is loaded when the first frame is requested.
+        self._frame_count = None
+        self._asset = None
+        if not xflsvg.lazy:
+            self._asset = xflsvg.get_safe_asset(self.safe_asset_id)
+
+    @property
+    def asset(self):
+        if self._asset is None:
+            self._asset = self.xflsvg.get_safe_asset(self.safe_asset_id)
+        return self._asset
+
+    @property
+    def frame_count(self):
+        if self._frame_count is None:
+            self._frame_count = self.xflsvg.get_safe_frame_count(self.safe_asset_id)
+        return self._frame_count
+
+    @property
+    def first_frame(self):
+        return self._first_frame % self.frame_count
+
+    @property
+    def last_frame(self):
+        return self._last_frame % self.frame_count
+
     def __getitem__(self, iteration: int) -> Frame:
+        if self._frame_count is None:
+            # The frame needs the asset anyway, so if the reader hasn't
+            # counted its frames yet, load it rather than scan it first
+            self._frame_count = self.xflsvg.get_safe_frame_count(
+                self.safe_asset_id, load=True
+            )
+
         if self.loop_type in ("single frame", None):
             frame_index = self.first_frame
         elif self.loop_type == "play once":
             frame_index = min(self.first_frame + iteration, self.last_frame)
         elif self.loop_type == "loop":
-            loop_size = (
-                self.asset.frame_count
-            )  # should this take last_frame into account?
+            loop_size = self.frame_count  # should this take last_frame into account?
             frame_index = (self.first_frame + iteration) % loop_size
         else:
             raise Exception(f"Unknown loop type: {self.loop_type}")
 
-        result = _transformed_frame(self.asset[frame_index], self.matrix, self.color)
+        result = _transformed_frame(
+            self.asset[frame_index],
+            self.matrix,
+            self.color,
+            self.xflsvg.new_frame_identifier(),
+        )
         result.owner_element = self
         result.frame_index = frame_index
-        return result
+        return self.xflsvg.intern_frame(result)
 
     def __len__(self) -> int:
         return self.duration
@@ -357,28 +772,39 @@ class ShapeElement(Element):
     def __init__(
         self, xflsvg, asset, layer, start_frame_index, duration, path, xmlnode
     ):
-        super().__init__(xmlnode)
-        self.xflsvg = xflsvg
+        super().__init__(xmlnode, xflsvg)
         self.asset = asset
         self.layer = layer
+        self.start_frame_index = start_frame_index
         self.duration = duration
         self.path = tuple(path)
-        self.svg_frame = xflsvg.get_shape(
-            xmlnode,
-            asset.id,
-            layer.index,
-            start_frame_index,
+
+    @property
+    def svg_frame(self):
+        # Look the shape up every time rather than holding on to it so that
+        # the reader's cache can evict converted shapes.
+        svg_frame = self.xflsvg.get_shape(
+            self.xmlnode,
+            self.asset.id,
+            self.layer.index,
+            self.start_frame_index,
             self.path,
         )
 
-        self.svg_frame.owner = self
-        self.svg_frame.frame_index = 0
+        svg_frame.owner_element = self
+        svg_frame.frame_index = 0
+        return svg_frame
 
     def __getitem__(self, iteration: int) -> Frame:
-        result = _transformed_frame(self.svg_frame, self.matrix, self.color)
+        result = _transformed_frame(
+            self.svg_frame,
+            self.matrix,
+            self.color,
+            self.xflsvg.new_frame_identifier(),
+        )
         result.owner_element = self
         result.frame_index = 0
-        return result
+        return self.xflsvg.intern_frame(result)
 
     def __len__(self) -> int:
         return self.duration
@@ -398,8 +824,7 @@ class GroupElement(Element, BundleContext):
     def __init__(
         self, xflsvg, asset, layer, start_frame_index, duration, path, xmlnode
     ):
-        super().__init__(xmlnode)
-        self.xflsvg = xflsvg
+        super().__init__(xmlnode, xflsvg)
         self.asset = asset
         self.layer = layer
         self.start_frame_index = start_frame_index
@@ -407,10 +832,8 @@ class GroupElement(Element, BundleContext):
         self.path = path
         self.elements = []
 
-        for i, element_xmlnode in enumerate(
-            xmlnode.findChild("members", recursive=False).findChildren(recursive=False)
-        ):
-            element_type = element_xmlnode.name
+        for i, element_xmlnode in enumerate(xmlnode.find("{*}members")):
+            element_type = _tag_name(element_xmlnode)
             if element_type == "DOMShape":
                 element = ShapeElement(
                     self.xflsvg,
@@ -434,13 +857,13 @@ class GroupElement(Element, BundleContext):
                     element_xmlnode,
                 )
             else:
-                element = Element(element_xmlnode)
+                element = Element(element_xmlnode, self.xflsvg)
 
             element.owner_element = self
             self.elements.append(element)
 
     def __getitem__(self, iteration: int) -> Frame:
-        result = Frame(color=self.color)
+        result = Frame(color=self.color, identifier=self.xflsvg.new_frame_identifier())
         result.owner_element = self
         result.frame_index = iteration
         for child in self.elements:
@@ -448,7 +871,7 @@ class GroupElement(Element, BundleContext):
 
         result.owner_element = self
         result.frame_index = iteration
-        return result
+        return self.xflsvg.intern_frame(result)
 
     def __len__(self) -> int:
         return self.duration
@@ -464,15 +887,26 @@ class ElementBundle(AnimationObject, BundleContext):
         self.start_frame_index = int(xmlnode.get("index"))
         self.duration = int(xmlnode.get("duration", default=1))
         self.end_frame_index = self.start_frame_index + self.duration
-        self._frames = {}
         self.element_index = 0
-        self.elements = []
-        self.tweens = xmlnode.tweens and MotionTween(xmlnode)
+        tweens = xmlnode.find("{*}tweens")
+        self.tweens = MotionTween(xmlnode) if tweens is not None else None
+
+        # In lazy mode, elements are only created once one of this bundle's
+        # frames is requested.
+        self._elements = None
+        if not xflsvg.lazy:
+            self._elements = self._load_elements()
 
-        for i, element_xmlnode in enumerate(
-            xmlnode.elements.findChildren(recursive=False)
-        ):
-            element_type = element_xmlnode.name
+    @property
+    def elements(self):
+        if self._elements is None:
+            self._elements = self._load_elements()
+        return self._elements
+
+    def _load_elements(self):
+        elements = []
+        for i, element_xmlnode in enumerate(self.xmlnode.find("{*}elements")):
+            element_type = _tag_name(element_xmlnode)
             if element_type == "DOMShape":
                 element = ShapeElement(
                     self.xflsvg,
@@ -496,16 +930,19 @@ class ElementBundle(AnimationObject, BundleContext):
                     element_xmlnode,
                 )
             else:
-                element = Element(element_xmlnode)
+                element = Element(element_xmlnode, self.xflsvg)
 
             element.owner_element = self
-            self.elements.append(element)
+            elements.append(element)
+
+        return elements
 
     def __getitem__(self, frame_index: int) -> Frame:
-        if frame_index in self._frames:
-            return self._frames[frame_index]
+        cached_frame = self.xflsvg.cache.get((self, frame_index))
+        if cached_frame is not None:
+            return cached_frame
 
-        new_frame = Frame()
+        new_frame = Frame(identifier=self.xflsvg.new_frame_identifier())
 
         if not self.has_index(frame_index):
             return new_frame
@@ -514,9 +951,10 @@ class ElementBundle(AnimationObject, BundleContext):
         for element in self.elements:
             new_frame.add_child(element[iteration])
 
-        self._frames[frame_index] = new_frame
         new_frame.owner_element = self
         new_frame.frame_index = frame_index
+        new_frame = self.xflsvg.intern_frame(new_frame)
+        self.xflsvg.cache[(self, frame_index)] = new_frame
         return new_frame
 
     def __len__(self) -> int:
@@ -563,10 +1001,10 @@ class Layer(AnimationObject):
         self.end_frame_index = 0
         self.layer_type = xmlnode.get("layerType", "normal")
         self.mask_layer = _get_mask_layer(asset, xmlnode)
-        self._frames = {}
 
-        if self.xmlnode.frames:
-            for bundle_xmlnode in self.xmlnode.frames.findChildren(recursive=False):
+        frames_xmlnode = self.xmlnode.find("{*}frames")
+        if frames_xmlnode is not None:
+            for bundle_xmlnode in frames_xmlnode:
                 new_bundle = ElementBundle(xflsvg, self, bundle_xmlnode)
                 new_bundle.owner_element = self
                 self.bundles.append(new_bundle)
@@ -578,18 +1016,39 @@ class Layer(AnimationObject):
                         self.end_frame_index, new_bundle.end_frame_index
                     )
 
+        # Bundles in a layer don't overlap, so sorting them by their first
+        # frame lets us find the bundle for any frame with a binary search.
+        self.bundles.sort(key=lambda bundle: bundle.start_frame_index)
+        self._bundle_starts = [bundle.start_frame_index for bundle in self.bundles]
+
+    def get_bundle(self, frame_index):
+        """Get the bundle that covers frame_index, or None if there isn't one."""
+        position = bisect_right(self._bundle_starts, frame_index) - 1
+        if position < 0:
+            return None
+
+        bundle = self.bundles[position]
+        if not bundle.has_index(frame_index):
+            return None
+
+        return bundle
+
     def __getitem__(self, frame_index: int) -> Frame:
-        if frame_index in self._frames:
-            return self._frames[frame_index]
+        cached_frame = self.xflsvg.cache.get((self, frame_index))
+        if cached_frame is not None:
+            return cached_frame
 
-        new_frame = Frame()
-        for bundle in self.bundles:
-            if bundle.has_index(frame_index):
-                new_frame.add_child(bundle[frame_index])
+        return self._new_frame(frame_index, self.get_bundle(frame_index))
+
+    def _new_frame(self, frame_index, bundle):
+        new_frame = Frame(identifier=self.xflsvg.new_frame_identifier())
+        if bundle is not None:
+            new_frame.add_child(bundle[frame_index])
 
-        self._frames[frame_index] = new_frame
         new_frame.owner_element = self
         new_frame.frame_index = frame_index
+        new_frame = self.xflsvg.intern_frame(new_frame)
+        self.xflsvg.cache[(self, frame_index)] = new_frame
 
         return new_frame
 
@@ -598,8 +1057,21 @@ class Layer(AnimationObject):
 
     @property
     def frames(self):
+        # Walk the bundles in order rather than searching for every frame.
+        bundles = iter(self.bundles)
+        bundle = next(bundles, None)
+
         for i in range(self.end_frame_index):
-            yield self[i]
+            while bundle is not None and bundle.end_frame_index <= i:
+                bundle = next(bundles, None)
+
+            cached_frame = self.xflsvg.cache.get((self, i))
+            if cached_frame is not None:
+                yield cached_frame
+            elif bundle is not None and bundle.has_index(i):
+                yield self._new_frame(i, bundle)
+            else:
+                yield self._new_frame(i, None)
 
 
 class Asset(AnimationObject):
@@ -609,12 +1081,12 @@ class Asset(AnimationObject):
         self.xflsvg = xflsvg
         self.id = id
         self.layers = []
-        self._frames = {}
         self.frame_count = 0
 
-        timeline = timeline or xmlnode.timeline
+        if timeline is None:
+            timeline = xmlnode.find("{*}timeline/{*}DOMTimeline")
 
-        for index, xmlnode in enumerate(timeline.layers.findChildren(recursive=False)):
+        for index, xmlnode in enumerate(timeline.find("{*}layers")):
             layer_id = f"{self.id}_L{index}"
             layer = Layer(xflsvg, self, layer_id, index, xmlnode)
             layer.owner_element = self
@@ -622,14 +1094,17 @@ class Asset(AnimationObject):
             self.frame_count = max(self.frame_count, layer.end_frame_index)
 
     def __getitem__(self, frame_index: int) -> Frame:
-        if frame_index in self._frames:
-            return self._frames[frame_index]
+        cached_frame = self.xflsvg.cache.get((self, frame_index))
+        if cached_frame is not None:
+            return cached_frame
 
-        new_frame = Frame()
+        new_frame = Frame(identifier=self.xflsvg.new_frame_identifier())
         masked_frames = {}
         for layer in self.layers:
             if layer.layer_type == "mask":
-                layer_frame = MaskedFrame(layer[frame_index])
+                layer_frame = MaskedFrame(
+                    layer[frame_index], self.xflsvg.new_frame_identifier()
+                )
                 masked_frames[layer.index] = layer_frame
                 new_frame.prepend_child(layer_frame)
 
@@ -640,9 +1115,16 @@ class Asset(AnimationObject):
                 else:
                     new_frame.prepend_child(layer_frame)
 
-        self._frames[frame_index] = new_frame
+        if self.xflsvg.intern_frames:
+            # Masked frames are only complete once every layer is added
+            new_frame.children = [
+                self.xflsvg.intern_frame(child) for child in new_frame.children
+            ]
+
         new_frame.owner_element = self
         new_frame.frame_index = frame_index
+        new_frame = self.xflsvg.intern_frame(new_frame)
+        self.xflsvg.cache[(self, frame_index)] = new_frame
         return new_frame
 
     def __len__(self) -> int:
@@ -656,9 +1138,7 @@ class Asset(AnimationObject):
 
 class Document(Asset):
     def __init__(self, xflsvg, xmlnode, timeline=0):
-        available_timelines = xmlnode.timelines.findChildren(
-            "DOMTimeline", recursive=False
-        )
+        available_timelines = xmlnode.find("{*}timelines").findall("{*}DOMTimeline")
         if isinstance(timeline, int):
             dom_timeline = available_timelines[timeline]
         elif isinstance(timeline, str):
@@ -666,77 +1146,357 @@ class Document(Asset):
                 if dom_timeline.get("name") == timeline:
                     break
 
-        assert dom_timeline, "Unable to find timeline in XFL document"
+        assert dom_timeline is not None, "Unable to find timeline in XFL document"
         timeline_name = dom_timeline.get("name")
 
         super().__init__(
             xflsvg,
-            f"file:///{xflsvg.id}.xfl/{timeline_name}",
+            xflsvg.get_timeline_id(timeline_name),
             xmlnode,
             timeline=dom_timeline,
         )
 
 
 class XflReader:
-    def __init__(self, xflsvg_dir: str):
-        self.filepath = os.path.normpath(xflsvg_dir)  # deal with trailing /
-        self.id = os.path.basename(self.filepath)  # MUST come after normpath
+    def __init__(
+        self,
+        xflsvg_dir: str,
+        lazy=False,
+        cache_size=None,
+        cache_dir=None,
+        intern_frames=False,
+        shape_cache=None,
+        path_precision=None,
+        relative_paths=False,
+    ):
+        """Open an XFL document.
+
+        Args:
+            xflsvg_dir: Directory containing DOMDocument.xml, a .fla file (path
+                or open binary file object), or a compiled XFL file from
+                compile_xfl. Compiled files contain pickled data, so only
+                open trusted ones.
+            lazy: If True, elements are only created when a frame that shows
+                them is requested, and referenced LIBRARY assets are only
+                loaded then. Otherwise, opening a timeline loads everything
+                reachable from it.
+            cache_size: Maximum number of frames and converted shapes to keep
+                cached, or None for no limit. Frames evicted from the cache
+                are rebuilt when they're requested again. See self.cache for
+                hit, miss and eviction counts.
+            cache_dir: Optional directory for caching converted shapes across
+                runs. When a file is loaded, all of its shapes are converted
+                and saved here, keyed by a hash of the file's contents. Loading
+                the same file again later reuses them. Mask SVGs are not
+                cached, and neither are compiled XFL files, which already
+                store converted shapes. Entries are pickled, so untrusted
+                users must not be able to write to this directory.
+            intern_frames: If True, frames with the same children, matrix
+                and color are merged into one canonical frame, so repeated
+                content shares memory and identifiers. A canonical frame's
+                owner_element, frame_index and parent_frame come from one of
+                the places it's used, not necessarily the one being rendered.
+            shape_cache: Optional ShapeContentCache. Shapes are converted
+                through it, so shapes with the same styles and edges are only
+                converted once, even across readers that share the cache.
+            path_precision: Optional number of decimal places to round SVG
+                path coordinates to. By default, they have full precision.
+            relative_paths: If True, SVG paths use relative commands, which
+                makes them more compact. Requires a path_precision. Shapes
+                stored in compiled XFL files use the default format, so they're
+                converted again when either option is set.
+        """
+        if relative_paths and path_precision is None:
+            raise ValueError("relative_paths requires a path_precision")
+
+        self.files = open_xfl(xflsvg_dir)
+        self.filepath = self.files.path
+        self.id = self.files.id
+        self.lazy = lazy
+        self.cache = LruCache(cache_size)
         self._assets = {}
-        self._shapes = {}
+        self._frame_counts = {}
+        # {asset id: safe ids of the assets it references}
+        self._preloaded_assets = {}
+        # {(asset id, layer index, frame index, element path): StoredShape}
+        self._stored_shapes = {}
+        self.disk_cache = ShapeDiskCache(cache_dir) if cache_dir else None
+        self.intern_frames = intern_frames
+        self.shape_cache = shape_cache
+        # Parsed fill and stroke styles, shared by this reader's shapes
+        self.styles = StyleTable()
+        self.path_options = {}
+        if path_precision is not None or relative_paths:
+            self.path_options = {
+                "precision": path_precision,
+                "relative": relative_paths,
+            }
+        self._frame_identifiers = itertools.count()
+        self._interned_frames = weakref.WeakValueDictionary()
+
+        # None stands for the document in self._preloaded_assets
+        self.xmlnode = self._parse(None, DOCUMENT_NAME)
+
+        self.width = int(self.xmlnode.attrib["width"])
+        self.height = int(self.xmlnode.attrib["height"])
+        self.background = self.xmlnode.get("backgroundColor", "#FFFFFF")
+
+    def close(self):
+        """Close the reader's files. Shapes from a compiled XFL file that
+        haven't been loaded yet can't be used afterwards."""
+        self.files.close()
 
-        document_path = os.path.join(xflsvg_dir, "DOMDocument.xml")
-        with open(document_path) as document_file:
-            self.xmlnode = BeautifulSoup(document_file, "xml")
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-        self.width = int(self.xmlnode.DOMDocument["width"])
-        self.height = int(self.xmlnode.DOMDocument["height"])
-        self.background = self.xmlnode.DOMDocument.get("backgroundColor", "#FFFFFF")
+    def get_timeline_id(self, timeline_name):
+        """Get the asset ID of a document timeline."""
+        return f"file:///{self.id}.xfl/{timeline_name}"
 
     def get_timeline(self, timeline=0):
         return Document(self, self.xmlnode, timeline)
 
+    def _get_asset_name(self, safe_asset_id):
+        default_asset_name = f"LIBRARY/{safe_asset_id}.xml"
+        if self.files.exists(default_asset_name):
+            return default_asset_name
+
+        return default_asset_name.replace("&", "_")
+
     def get_safe_asset(self, safe_asset_id):
         asset_id = html.unescape(safe_asset_id)
 
         if asset_id in self._assets:
             return self._assets[asset_id]
 
-        default_asset_path = os.path.join(
-            self.filepath, "LIBRARY", f"{safe_asset_id}.xml"
-        )
-        if os.path.exists(default_asset_path):
-            asset_path = default_asset_path
-        else:
-            asset_path = default_asset_path.replace("&", "_")
-
-        with open(asset_path) as asset_file:
-            asset_soup = BeautifulSoup(asset_file, "xml")
-
-        asset = Asset(self, asset_id, asset_soup)
+        asset_xmlnode = self._parse(asset_id, self._get_asset_name(safe_asset_id))
+        asset = Asset(self, asset_id, asset_xmlnode)
         self._assets[asset_id] = asset
+        self._frame_counts[asset_id] = asset.frame_count
         return asset
 
     def get_asset(self, asset_id):
         return self.get_safe_asset(html.escape(asset_id))
 
+    def get_safe_frame_count(self, safe_asset_id, load=False):
+        """Get the number of frames in an asset without loading it.
+
+        Counts are cached, and loading an asset also records its count. If the
+        count isn't known yet, compiled files have it stored, and other files
+        only have their <DOMFrame> attributes scanned. If load is True, the
+        asset is loaded instead of scanned, for callers that need it anyway.
+        """
+        asset_id = html.unescape(safe_asset_id)
+
+        if asset_id not in self._frame_counts:
+            asset_name = self._get_asset_name(safe_asset_id)
+            if self.files.precompiled:
+                self._frame_counts[asset_id] = self.files.get_frame_count(asset_name)
+            elif load:
+                self.get_safe_asset(safe_asset_id)
+            else:
+                with self.files.open(asset_name) as asset_file:
+                    self._frame_counts[asset_id] = _scan_frame_count(asset_file)
+
+        return self._frame_counts[asset_id]
+
+    def get_frame_count(self, asset_id):
+        return self.get_safe_frame_count(html.escape(asset_id))
+
     def get_shape(self, xmlnode, asset_id, layer_index, frame_index, path):
         key = (asset_id, layer_index, frame_index, tuple(path))
-        if key in self._shapes:
-            return self._shapes[key]
-
-        xmlnode = etree.fromstring(str(xmlnode))
-        normal_svg = xfl_domshape_to_svg(xmlnode, False)
-        mask_svg = xfl_domshape_to_svg(xmlnode, True)
-        result = ShapeFrame(normal_svg, mask_svg)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        normal_svg = None
+        stored_shape = self._stored_shapes.get(key)
+        if stored_shape is not None:
+            xmlnode = None
+        elif self._preloaded_assets:
+            normal_svg = self.cache.get(("converted", *key))
+
+        result = ShapeFrame(
+            xmlnode,
+            normal_svg,
+            self.new_frame_identifier(),
+            self.shape_cache,
+            self.path_options,
+            stored_shape,
+            self.styles,
+        )
 
-        self._shapes[key] = result
+        self.cache[key] = result
         return result
 
+    def new_frame_identifier(self):
+        """Allocate an identifier for a new frame.
+
+        Identifiers are unique within this reader and are allocated in the
+        order frames are created, so the same sequence of calls on a fresh
+        reader always produces the same identifiers.
+        """
+        return next(self._frame_identifiers)
+
+    def intern_frame(self, frame):
+        """Get the canonical frame with the same structure as frame.
+
+        Frames are compared by their type, matrix, color, mask and the
+        identifiers of their children. Children are interned before their
+        parents, so equal subtrees end up as one object. Shape frames are
+        already shared through get_shape, so they're returned as-is. Does
+        nothing unless the reader was created with intern_frames=True.
+        """
+        if not self.intern_frames or isinstance(frame, ShapeFrame):
+            return frame
+
+        key = (
+            type(frame),
+            frame.matrix,
+            frame.color,
+            frame.mask.identifier if isinstance(frame, MaskedFrame) else None,
+            tuple(child.identifier for child in frame.children),
+        )
+        return self._interned_frames.setdefault(key, frame)
+
+    def _add_preloaded_shapes(self, asset_id, shapes):
+        """Keep converted shapes from _get_xfl_shapes for get_shape to use.
+
+        The shapes are kept in self.cache, so cache_size bounds them too. A
+        shape that's evicted before it's used is converted again on demand.
+        An asset_id of None means the shapes come from the document.
+        """
+        for (timeline_name, *shape_key), svg in shapes.items():
+            timeline_id = asset_id or self.get_timeline_id(timeline_name)
+            self.cache[("converted", timeline_id, *shape_key)] = svg
+
+    def _parse(self, asset_id, name):
+        """Parse the file of an asset. Shapes stored in a compiled XFL file or
+        the disk cache are kept for get_shape to use.
+
+        An asset_id of None means the file is the document.
+        """
+        if self.files.precompiled:
+            xmlnode = self.files.parse(name)
+            shapes = self.files.get_shapes(name)
+            for (timeline_name, *shape_key), stored_shape in shapes.items():
+                timeline_id = asset_id or self.get_timeline_id(timeline_name)
+                self._stored_shapes[(timeline_id, *shape_key)] = stored_shape
+            return xmlnode
+
+        xml_bytes = self.files.read(name)
+        xmlnode = etree.fromstring(xml_bytes)
+        if self.disk_cache is not None and asset_id not in self._preloaded_assets:
+            shapes, references = _get_xfl_shapes(
+                xml_bytes,
+                self.disk_cache,
+                xmlnode,
+                self.shape_cache,
+                styles=self.styles,
+                **self.path_options,
+            )
+            self._preloaded_assets[asset_id] = references
+            self._add_preloaded_shapes(asset_id, shapes)
+
+        return xmlnode
+
+    def preload(self, workers=None):
+        """Convert the shapes of the document and every reachable LIBRARY asset
+        in parallel.
+
+        LIBRARY files are discovered by following symbol instances from the
+        document. Each file is parsed and its shapes are converted to SVG in a
+        process pool. The reader keeps the converted shapes in self.cache and
+        uses them when the shapes are requested. Mask SVGs are still built on
+        demand.
+
+        Assets themselves are still created on demand. Parsing XML in this
+        process is faster than unpickling a parsed tree from a worker. If the
+        reader has a cache_dir, workers read from and write to it. Compiled
+        XFL files already store converted shapes, so this does nothing for
+        them. With path options, their shapes are converted on demand.
+
+        On Windows, this must be called under `if __name__ == "__main__":`.
+
+        Args:
+            workers: Number of worker processes. Defaults to the CPU count.
+        """
+        if self.files.precompiled:
+            return
+
+        pending = {}
+
+        # Assets whose references have been followed. Assets that were already
+        # loaded (e.g. from the disk cache) aren't converted again, but their
+        # references still need to be followed.
+        walked = {None}
+
+        with ProcessPoolExecutor(workers) as executor:
+
+            def submit(safe_asset_ids):
+                stack = list(safe_asset_ids)
+                while stack:
+                    safe_asset_id = stack.pop()
+                    asset_id = html.unescape(safe_asset_id)
+                    if asset_id in walked:
+                        continue
+
+                    walked.add(asset_id)
+                    if asset_id in self._preloaded_assets:
+                        stack.extend(self._preloaded_assets[asset_id])
+                        continue
+
+                    asset_name = self._get_asset_name(safe_asset_id)
+                    future = executor.submit(
+                        _get_xfl_shapes,
+                        self.files.read(asset_name),
+                        self.disk_cache,
+                        **self.path_options,
+                    )
+                    pending[future] = asset_id
+
+            if None in self._preloaded_assets:
+                submit(self._preloaded_assets[None])
+            else:
+                future = executor.submit(
+                    _get_xfl_shapes,
+                    self.files.read(DOCUMENT_NAME),
+                    self.disk_cache,
+                    **self.path_options,
+                )
+                pending[future] = None
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    asset_id = pending.pop(future)
+                    shapes, references = future.result()
+                    self._preloaded_assets[asset_id] = references
+                    self._add_preloaded_shapes(asset_id, shapes)
+                    submit(references)
+
 
 class XflRenderer:
     _contexts = threading.local()
     _contexts.stack = []
 
+    HOOKS = (
+        "render_shape",
+        "push_transform",
+        "pop_transform",
+        "push_mask",
+        "pop_mask",
+        "push_masked_render",
+        "pop_masked_render",
+        "on_frame_rendered",
+    )
+
+    # {renderer class: names of the hooks it overrides}
+    _overridden_hook_names = {}
+
     @classmethod
     def current(cls):
         if XflRenderer._contexts.stack == []:
@@ -745,6 +1505,21 @@ class XflRenderer:
             )
         return XflRenderer._contexts.stack[-1]
 
+    def get_overridden_hooks(self):
+        """Get {hook name: bound method} for every hook that this renderer's
+        class overrides."""
+        renderer_class = type(self)
+        names = XflRenderer._overridden_hook_names.get(renderer_class)
+        if names is None:
+            names = [
+                name
+                for name in XflRenderer.HOOKS
+                if getattr(renderer_class, name) is not getattr(XflRenderer, name)
+            ]
+            XflRenderer._overridden_hook_names[renderer_class] = names
+
+        return {name: getattr(self, name) for name in names}
+
     def render_shape(self, svg_frame, *args, **kwargs):
         pass
 
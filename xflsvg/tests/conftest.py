@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+XMLNS = 'xmlns="http://ns.adobe.com/xfl/2008/"'
+
+
+def domshape(color, edges):
+    """A <DOMShape> with one solid fill on the left of `edges`."""
+    return f"""
+    <DOMShape>
+      <fills>
+        <FillStyle index="1"><SolidColor color="{color}"/></FillStyle>
+      </fills>
+      <edges>
+        <Edge fillStyle0="1" edges="{edges}"/>
+      </edges>
+    </DOMShape>"""
+
+
+def layer(*frames, **attrib):
+    """A <DOMLayer>. Each frame is (index, duration, elements XML)."""
+    attrs = "".join(f' {key}="{value}"' for key, value in attrib.items())
+    frames_xml = "".join(
+        f'<DOMFrame index="{index}" duration="{duration}">'
+        f"<elements>{elements}</elements></DOMFrame>"
+        for index, duration, elements in frames
+    )
+    return f'<DOMLayer name="Layer"{attrs}><frames>{frames_xml}</frames></DOMLayer>'
+
+
+def symbol_instance(name, loop="loop", first_frame=0):
+    return (
+        f'<DOMSymbolInstance libraryItemName="{name}" loop="{loop}"'
+        f' firstFrame="{first_frame}"/>'
+    )
+
+
+def write_xfl(directory, document_layers, symbols=None):
+    """Write an XFL directory.
+
+    Args:
+        document_layers: <DOMLayer>s of the document's "Scene 1" timeline
+        symbols: {library item name: <DOMLayer>s of its timeline}
+    """
+    os.makedirs(os.path.join(directory, "LIBRARY"), exist_ok=True)
+    with open(os.path.join(directory, "DOMDocument.xml"), "w") as outfile:
+        outfile.write(
+            f'<DOMDocument {XMLNS} width="100" height="100"><timelines>'
+            f'<DOMTimeline name="Scene 1"><layers>{"".join(document_layers)}'
+            "</layers></DOMTimeline></timelines></DOMDocument>"
+        )
+
+    for name, symbol_layers in (symbols or {}).items():
+        path = os.path.join(directory, "LIBRARY", f"{name}.xml")
+        with open(path, "w") as outfile:
+            outfile.write(
+                f'<DOMSymbolItem {XMLNS} name="{name}"><timeline>'
+                f'<DOMTimeline name="{name}"><layers>{"".join(symbol_layers)}'
+                "</layers></DOMTimeline></timeline></DOMSymbolItem>"
+            )
+
+    return str(directory)
+
+
+@pytest.fixture
+def xfl_dir(tmp_path):
+    """A document that shows a red square from a symbol, masked by a blue
+    triangle drawn in the document."""
+    square = domshape("#FF0000", "!0 0|200 0!200 0|200 200!200 200|0 200!0 200|0 0")
+    triangle = domshape("#0000FF", "!0 0|400 0!400 0|0 400!0 400|0 0")
+    return write_xfl(
+        tmp_path / "doc",
+        [
+            layer((0, 2, triangle), layerType="mask"),
+            layer((0, 2, symbol_instance("Square")), parentLayerIndex="0"),
+        ],
+        {"Square": [layer((0, 3, square))]},
+    )
@@ -0,0 +1,128 @@
+import os
+
+import pytest
+
+from test_files import render_timeline
+from xflsvg import ShapeContentCache, XflReader
+from xflsvg import cache
+from xflsvg import xflsvg as xflsvg_module
+from xflsvg.cache import CACHE_FORMAT_VERSION, LruCache, ShapeDiskCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LruCache(max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+
+    assert "b" not in cache
+    assert cache.items() == [("a", 1), ("c", 3)]
+    assert cache.get("b", "missing") == "missing"
+    assert cache.stats() == {
+        "entries": 2,
+        "max_entries": 2,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_lru_cache_items_doesnt_use_entries():
+    cache = LruCache(max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.items()
+    cache["c"] = 3
+    assert cache.items() == [("b", 2), ("c", 3)]
+    assert cache.hits == 0
+
+
+def test_unbounded_lru_cache():
+    cache = LruCache()
+    for i in range(1000):
+        cache[i] = i
+    assert len(cache) == 1000
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_shape_disk_cache_round_trip(tmp_path):
+    disk_cache = ShapeDiskCache(str(tmp_path))
+    key = disk_cache.get_key(b"<DOMSymbolItem/>")
+    assert key != disk_cache.get_key(b"<DOMSymbolItem/>", precision=2)
+    assert disk_cache.load(key) is None
+
+    disk_cache.save(key, ({"shape": 1}, {"Symbol"}))
+    assert ShapeDiskCache(str(tmp_path)).load(key) == ({"shape": 1}, {"Symbol"})
+
+
+def test_shape_disk_cache_ignores_other_versions(tmp_path):
+    disk_cache = ShapeDiskCache(str(tmp_path))
+    key = disk_cache.get_key(b"<DOMSymbolItem/>")
+    disk_cache.save(key, "value")
+
+    path = disk_cache._get_path(key)
+    with open(path, "r+b") as cache_file:
+        cache_file.seek(7)
+        cache_file.write((CACHE_FORMAT_VERSION + 1).to_bytes(4, "little"))
+    assert disk_cache.load(key) is None
+
+
+def fail_normal_conversion(monkeypatch):
+    """Make converting a shape fail, except as a mask. Caches only store normal
+    SVGs, and masks are converted when they're used."""
+
+    def wrap(convert):
+        def convert_masks(shapes, mask=False, *args, **kwargs):
+            assert mask, "A shape was converted"
+            return convert(shapes, mask, *args, **kwargs)
+
+        return convert_masks
+
+    for module in (xflsvg_module, cache):
+        for name in ("xfl_domshape_to_svg", "xfl_domshapes_to_svg"):
+            monkeypatch.setattr(module, name, wrap(getattr(module, name)))
+
+
+def test_reader_uses_the_disk_cache(xfl_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    with XflReader(xfl_dir, cache_dir=cache_dir) as reader:
+        expected = render_timeline(reader)
+    assert os.listdir(cache_dir)
+
+    fail_normal_conversion(monkeypatch)
+    with XflReader(xfl_dir, cache_dir=cache_dir) as reader:
+        assert render_timeline(reader) == expected
+
+
+def test_shape_content_cache_round_trip(xfl_dir, tmp_path, monkeypatch):
+    path = str(tmp_path / "shapes.pickle")
+    shape_cache = ShapeContentCache(path)
+    with XflReader(xfl_dir, shape_cache=shape_cache) as reader:
+        expected = render_timeline(reader)
+    assert len(shape_cache) == 2
+    shape_cache.save()
+
+    loaded = ShapeContentCache(path)
+    assert [key for key, _ in loaded.entries.items()] == [
+        key for key, _ in shape_cache.entries.items()
+    ]
+
+    fail_normal_conversion(monkeypatch)
+    with XflReader(xfl_dir, shape_cache=loaded) as reader:
+        assert render_timeline(reader) == expected
+
+
+def test_shape_content_cache_converts_each_shape_once(xfl_dir):
+    shape_cache = ShapeContentCache()
+    for _ in range(2):
+        with XflReader(xfl_dir, shape_cache=shape_cache) as reader:
+            render_timeline(reader)
+    assert shape_cache.entries.misses == 2
+    assert shape_cache.entries.hits == 2
+
+
+def test_shape_content_cache_needs_a_path():
+    with pytest.raises(Exception, match="No path"):
+        ShapeContentCache().save()
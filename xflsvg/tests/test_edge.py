@@ -0,0 +1,164 @@
+from collections import Counter, defaultdict
+
+import numpy as np
+import pytest
+
+from xflsvg.domshape.edge import (
+    LINE,
+    MOVE,
+    QUAD_CONTROL,
+    QUAD_END,
+    edge_format_to_arrays,
+    edge_format_to_point_lists,
+    edge_formats_to_arrays,
+    point_lists_to_shapes,
+)
+
+
+def segments(shapes):
+    """Count the (fill style ID, point, next point) pairs of every shape."""
+    return Counter(
+        (fill_id, point, next_point)
+        for fill_id, fill_shapes in shapes.items()
+        for shape in fill_shapes
+        for point, next_point in zip(shape, shape[1:])
+    )
+
+
+def input_segments(point_lists):
+    """segments() of the point lists passed to point_lists_to_shapes."""
+    shapes = defaultdict(list)
+    for point_list, fill_id in point_lists:
+        shapes[fill_id].append(point_list)
+    return segments(shapes)
+
+
+def polygon(*points):
+    """Point lists for the sides of a polygon, one per side."""
+    return [[points[i], points[(i + 1) % len(points)]] for i in range(len(points))]
+
+
+def test_joins_a_ring_into_one_shape():
+    point_lists = [(point_list, "1") for point_list in polygon((0, 0), (1, 0), (1, 1))]
+    shapes = point_lists_to_shapes(point_lists)
+    assert dict(shapes) == {"1": [[(0, 0), (1, 0), (1, 1), (0, 0)]]}
+
+
+def test_keeps_curves_and_closed_point_lists():
+    closed = [(0, 0), ((1, 1),), (2, 0), (0, 0)]
+    curve = [(5, 5), ((6, 6),), (7, 5)]
+    line = [(7, 5), (5, 5)]
+    shapes = point_lists_to_shapes([(closed, "1"), (curve, "2"), (line, "2")])
+    assert shapes["1"] == [closed]
+    assert shapes["2"] == [[(5, 5), ((6, 6),), (7, 5), (5, 5)]]
+
+
+def test_does_not_modify_point_lists():
+    point_lists = polygon((0, 0), (1, 0), (1, 1))
+    copies = [list(point_list) for point_list in point_lists]
+    point_lists_to_shapes([(point_list, "1") for point_list in point_lists])
+    assert point_lists == copies
+
+
+def test_fill_styles_are_joined_separately():
+    square = polygon((0, 0), (1, 0), (1, 1), (0, 1))
+    point_lists = [(point_list, "1") for point_list in square]
+    point_lists += [(point_list[::-1], "2") for point_list in square]
+    shapes = point_lists_to_shapes(point_lists)
+    assert segments(shapes) == input_segments(point_lists)
+    assert len(shapes["1"]) == len(shapes["2"]) == 1
+
+
+def test_shapes_that_share_a_point_are_split():
+    # Two triangles that touch at (0, 0)
+    point_lists = polygon((0, 0), (-1, 1), (-1, -1)) + polygon((0, 0), (1, -1), (1, 1))
+    shapes = point_lists_to_shapes([(point_list, "1") for point_list in point_lists])
+
+    assert len(shapes["1"]) == 2
+    for shape in shapes["1"]:
+        assert shape[0] == shape[-1]
+        assert len(set(shape)) == len(shape) - 1
+    assert segments(shapes) == segments({"1": point_lists})
+
+
+@pytest.mark.parametrize("size", [2, 10, 60])
+def test_checkerboard(size):
+    # Cells of the same fill touch at their corners, so most points have two
+    # point lists to pick from
+    point_lists = []
+    for row in range(size):
+        for col in range(size):
+            cell = polygon(
+                (col, row), (col + 1, row), (col + 1, row + 1), (col, row + 1)
+            )
+            fill_id = "1" if (row + col) % 2 else "2"
+            point_lists += [(point_list, fill_id) for point_list in cell]
+
+    shapes = point_lists_to_shapes(point_lists)
+    assert sum(map(len, shapes.values())) == size * size
+    for fill_shapes in shapes.values():
+        for shape in fill_shapes:
+            assert len(shape) == 5
+            assert shape[0] == shape[-1]
+    assert segments(shapes) == input_segments(point_lists)
+
+
+def test_open_shapes_fail():
+    point_lists = [([(0, 0), (1, 0)], "1"), ([(1, 0), (1, 1)], "1")]
+    with pytest.raises(AssertionError, match="Failed to build shape"):
+        point_lists_to_shapes(point_lists)
+
+
+def test_parses_edge_format_into_integer_arrays():
+    commands, points = edge_format_to_arrays("!0 0|100 200/-20 0.5[10 10 20 -20")
+    assert commands.tolist() == [MOVE, LINE, LINE, QUAD_CONTROL, QUAD_END]
+    assert points.dtype == np.int64
+    assert (points // 256).tolist() == [
+        [0, 0],
+        [100, 200],
+        [-20, 0],
+        [10, 10],
+        [20, -20],
+    ]
+    assert points[2, 1] == 128
+
+
+def test_parses_adjacent_signed_numbers():
+    commands, points = edge_format_to_arrays("!100-200|-5-0.5")
+    assert commands.tolist() == [MOVE, LINE]
+    assert (points / 256).tolist() == [[100, -200], [-5, -0.5]]
+
+
+def test_parses_hex_numbers():
+    _, points = edge_format_to_arrays("!#1A.8 #FFFFEC.00|#0.01 0")
+    assert points.tolist() == [[0x1A80, -20 * 256], [1, 0]]
+
+
+def test_ignores_selects_and_whitespace():
+    commands, points = edge_format_to_arrays("!0 0S2 |20 40S7\n|60 0")
+    assert commands.tolist() == [MOVE, LINE, LINE]
+    assert (points // 256).tolist() == [[0, 0], [20, 40], [60, 0]]
+
+
+def test_parses_many_edge_formats_at_once():
+    edge_formats = ["!0 0|20 0", "!20 0[40 20 60 0|80 0", "!-1-1"]
+    commands, points, counts = edge_formats_to_arrays(edge_formats)
+    assert counts == [2, 4, 1]
+    for edges, start, end in [(edge_formats[0], 0, 2), (edge_formats[1], 2, 6)]:
+        single_commands, single_points = edge_format_to_arrays(edges)
+        assert commands[start:end].tolist() == single_commands.tolist()
+        assert points[start:end].tolist() == single_points.tolist()
+
+
+def test_malformed_edge_format_fails():
+    with pytest.raises(AssertionError, match="Malformed"):
+        edge_format_to_arrays("!0 0|20")
+
+
+def test_edge_format_to_point_lists():
+    point_lists = list(edge_format_to_point_lists("!0 0|20 0[40 20 -0 40!-0 40|0 60"))
+    assert point_lists == [[(0, 0), (1, 0), ((2, 1),), (0, 2), (0, 3)]]
+    # Pixels are the original numbers divided by 20, "-0" included
+    pixels = list(edge_format_to_point_lists("!#1.01 3.5|0 0"))[0][0]
+    assert pixels == ((0x101 / 256) / 20, 3.5 / 20)
+    assert str(point_lists[0][3][0]) == "0.0"
@@ -0,0 +1,142 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from xflsvg import SvgRenderer, XflReader, compile_xfl
+from xflsvg import files
+from xflsvg.xflsvg import ShapeFrame
+from xflsvg.files import open_xfl, pack_element, unpack_element
+
+
+def render_timeline(reader):
+    result = []
+    for frame in reader.get_timeline():
+        with SvgRenderer() as renderer:
+            frame.render()
+        svg = renderer.compile(reader.width, reader.height)
+        result.append(ET.tostring(svg.getroot()))
+    return result
+
+
+@pytest.fixture
+def compiled_path(xfl_dir, tmp_path):
+    path = str(tmp_path / "doc.xflc")
+    compile_xfl(xfl_dir, path, workers=1)
+    return path
+
+
+def test_compiled_file_renders_like_the_directory(xfl_dir, compiled_path):
+    with XflReader(xfl_dir) as reader:
+        expected = render_timeline(reader)
+
+    with XflReader(compiled_path) as reader:
+        assert reader.files.precompiled
+        assert render_timeline(reader) == expected
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_compiled_file_renders_like_the_directory_with_path_options(
+    xfl_dir, compiled_path, lazy
+):
+    options = {"path_precision": 1, "relative_paths": True, "lazy": lazy}
+    with XflReader(xfl_dir, **options) as reader:
+        expected = render_timeline(reader)
+
+    with XflReader(compiled_path, **options) as reader:
+        assert render_timeline(reader) == expected
+
+
+def test_opening_a_compiled_file_loads_no_shapes(compiled_path, monkeypatch):
+    class NoPickle:
+        @staticmethod
+        def loads(data):
+            raise AssertionError("A shape was unpickled")
+
+    monkeypatch.setattr(files, "pickle", NoPickle)
+
+    with XflReader(compiled_path) as reader:
+        reader.get_timeline()[0]
+        assert len(reader._stored_shapes) == 2
+
+        # Stored trees don't have shape content
+        assert reader.xmlnode.find(".//{*}DOMShape/{*}edges") is None
+
+        shape_frames = [
+            shape_frame
+            for _, shape_frame in reader.cache.items()
+            if isinstance(shape_frame, ShapeFrame)
+        ]
+        assert len(shape_frames) == 2
+        for shape_frame in shape_frames:
+            assert shape_frame._normal_svg is None
+            assert shape_frame._domshape is None
+
+
+def test_stored_shapes_are_loaded_when_used(compiled_path):
+    with XflReader(compiled_path) as reader:
+        for stored_shape in reader._stored_shapes.values():
+            fill_g, _, _ = stored_shape.normal_svg
+            assert fill_g.find("path") is not None
+            assert stored_shape.domshape.find("{*}edges") is not None
+
+
+def test_frame_counts_are_stored(compiled_path):
+    with XflReader(compiled_path, lazy=True) as reader:
+        assert reader.get_frame_count("Square") == 3
+        assert reader._assets == {}
+
+
+def test_close(compiled_path):
+    with XflReader(compiled_path) as reader:
+        stored_shape = next(iter(reader._stored_shapes.values()))
+    assert reader.files._mmap.closed
+    with pytest.raises(ValueError):
+        stored_shape.normal_svg
+
+    compiled = open_xfl(compiled_path)
+    compiled.close()
+    assert compiled._mmap.closed
+
+
+def test_outdated_compiled_file(compiled_path):
+    with open(compiled_path, "r+b") as compiled_file:
+        compiled_file.seek(len(files.COMPILED_XFL_MAGIC) - 1)
+        compiled_file.write(b"\x01")
+
+    with pytest.raises(Exception, match="outdated"):
+        open_xfl(compiled_path)
+
+
+def test_cannot_compile_a_compiled_file(compiled_path, tmp_path):
+    with pytest.raises(Exception, match="Already compiled"):
+        compile_xfl(compiled_path, str(tmp_path / "again.xflc"), workers=1)
+
+
+def test_pack_element_round_trip():
+    xml = (
+        '<DOMShape xmlns="http://ns.adobe.com/xfl/2008/" selected="true">\n'
+        '  <matrix><Matrix tx="1"/></matrix>\n'
+        '  <fills><FillStyle index="1"><SolidColor/></FillStyle></fills>\n'
+        '  <edges><Edge edges="!0 0|1 1"/></edges>\n'
+        "  <characters> </characters>\n"
+        "</DOMShape>"
+    )
+    element = ET.fromstring(xml)
+
+    full = unpack_element(pack_element(element))
+    assert full.get("selected") == "true"
+    assert [child.tag.rpartition("}")[2] for child in full] == [
+        "matrix",
+        "fills",
+        "edges",
+        "characters",
+    ]
+    assert full.text is None
+    assert full[3].text == " "
+    assert full.find("{*}edges/{*}Edge").get("edges") == "!0 0|1 1"
+
+    skeleton = unpack_element(pack_element(element, skip_shape_content=True))
+    assert [child.tag.rpartition("}")[2] for child in skeleton] == [
+        "matrix",
+        "characters",
+    ]
@@ -0,0 +1,200 @@
+import os
+import zipfile
+
+import pytest
+
+from conftest import domshape, layer, symbol_instance, write_xfl
+from test_files import render_timeline
+from xflsvg import XflReader
+from xflsvg import xflsvg as xflsvg_module
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Count calls to _scan_frame_count."""
+    calls = []
+    scan = xflsvg_module._scan_frame_count
+
+    def counting_scan(xml_file):
+        calls.append(xml_file)
+        return scan(xml_file)
+
+    monkeypatch.setattr(xflsvg_module, "_scan_frame_count", counting_scan)
+    return calls
+
+
+def symbol_document(tmp_path, loop, first_frame=0, frame_count=3):
+    """A document with one instance of a "Square" symbol."""
+    square = domshape("#FF0000", "!0 0|200 0!200 0|0 200!0 200|0 0")
+    return write_xfl(
+        tmp_path,
+        [layer((0, 4, symbol_instance("Square", loop, first_frame)))],
+        {"Square": [layer((0, frame_count, square))]},
+    )
+
+
+def get_symbol_element(reader):
+    (symbol_element,) = reader.get_timeline().layers[0].bundles[0].elements
+    return symbol_element
+
+
+def test_frame_count_doesnt_load_the_asset(xfl_dir, scans):
+    with XflReader(xfl_dir, lazy=True) as reader:
+        assert reader.get_frame_count("Square") == 3
+        assert reader.get_frame_count("Square") == 3
+        assert len(scans) == 1
+        assert reader._assets == {}
+
+
+def test_symbol_loop_math_doesnt_load_the_asset(tmp_path, scans):
+    path = symbol_document(tmp_path, "play once", first_frame=4, frame_count=3)
+    with XflReader(path, lazy=True) as reader:
+        symbol_element = get_symbol_element(reader)
+        assert symbol_element.frame_count == 3
+        assert symbol_element.first_frame == 1
+        assert symbol_element.last_frame == 2
+        assert reader._assets == {}
+
+        # The scanned count is used once frames are requested
+        assert symbol_element[0].frame_index == 1
+        assert "Square" in reader._assets
+        assert len(scans) == 1
+
+
+def test_frames_load_the_asset_instead_of_scanning_it(xfl_dir, scans):
+    with XflReader(xfl_dir, lazy=True) as reader:
+        reader.get_timeline()[0]
+        assert "Square" in reader._assets
+        assert reader.get_frame_count("Square") == 3
+        assert scans == []
+
+
+def test_eager_readers_dont_scan(xfl_dir, scans):
+    with XflReader(xfl_dir) as reader:
+        reader.get_timeline()
+        assert "Square" in reader._assets
+        assert reader.get_frame_count("Square") == 3
+        assert scans == []
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize(
+    "loop, first_frame, frame_indices",
+    [
+        ("loop", 1, [1, 2, 0, 1]),
+        ("play once", 1, [1, 2, 2, 2]),
+        ("single frame", 2, [2, 2, 2, 2]),
+        ("loop", 5, [2, 0, 1, 2]),
+    ],
+)
+def test_symbol_frame_indices(tmp_path, lazy, loop, first_frame, frame_indices):
+    with XflReader(symbol_document(tmp_path, loop, first_frame), lazy=lazy) as reader:
+        symbol_element = get_symbol_element(reader)
+        assert [symbol_element[i].frame_index for i in range(4)] == frame_indices
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    """Record (fill color, mask) for each shape converted on demand."""
+    calls = []
+    convert = xflsvg_module.xfl_domshape_to_svg
+
+    def recording_convert(shape_record, mask=False, *args, **kwargs):
+        color = shape_record.fill_styles[0][1].get("color")
+        calls.append((color, mask))
+        return convert(shape_record, mask, *args, **kwargs)
+
+    monkeypatch.setattr(xflsvg_module, "xfl_domshape_to_svg", recording_convert)
+    return calls
+
+
+def test_loading_frames_converts_no_shapes(xfl_dir, conversions):
+    with XflReader(xfl_dir) as reader:
+        list(reader.get_timeline().frames)
+        assert conversions == []
+
+
+def test_shapes_are_converted_once_when_rendered(xfl_dir, conversions):
+    with XflReader(xfl_dir) as reader:
+        render_timeline(reader)
+        render_timeline(reader)
+
+    # The triangle is only drawn as a mask, and the square is never masked
+    assert sorted(conversions) == [("#0000FF", True), ("#FF0000", False)]
+
+
+def test_reads_fla_files_like_directories(xfl_dir, tmp_path):
+    fla_path = tmp_path / "doc.fla"
+    with zipfile.ZipFile(fla_path, "w") as fla:
+        for name in ("DOMDocument.xml", "LIBRARY/Square.xml"):
+            fla.write(os.path.join(xfl_dir, name), name)
+
+    with XflReader(xfl_dir) as reader:
+        expected = render_timeline(reader)
+
+    with XflReader(str(fla_path)) as reader:
+        assert reader.id == "doc"
+        assert render_timeline(reader) == expected
+
+    with open(fla_path, "rb") as fla_file, XflReader(fla_file) as reader:
+        assert render_timeline(reader) == expected
+
+
+def test_parses_documents_into_element_trees(xfl_dir):
+    with XflReader(xfl_dir) as reader:
+        assert reader.xmlnode.tag == "{http://ns.adobe.com/xfl/2008/}DOMDocument"
+        assert (reader.width, reader.height) == (100, 100)
+        assert reader.background == "#FFFFFF"
+
+        timeline = reader.get_timeline()
+        assert len(timeline) == 2
+        assert [layer.layer_type for layer in timeline.layers] == ["mask", "normal"]
+        assert timeline.layers[1].mask_layer is timeline.layers[0]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_preload_converts_shapes_in_workers(xfl_dir, conversions, lazy):
+    with XflReader(xfl_dir) as reader:
+        expected = render_timeline(reader)
+    conversions.clear()
+
+    with XflReader(xfl_dir, lazy=lazy) as reader:
+        reader.preload(workers=1)
+        assert set(reader._preloaded_assets) == {None, "Square"}
+        converted = [key for key, _ in reader.cache.items() if key[0] == "converted"]
+        assert len(converted) == 2
+
+        assert render_timeline(reader) == expected
+
+    # Masks are still converted on demand
+    assert conversions == [("#0000FF", True)]
+
+
+def test_preloaded_shapes_are_bounded_by_the_cache(xfl_dir):
+    with XflReader(xfl_dir) as reader:
+        expected = render_timeline(reader)
+
+    with XflReader(xfl_dir, cache_size=1) as reader:
+        reader.preload(workers=1)
+        assert len(reader.cache) == 1
+        assert reader.cache.evictions >= 1
+        assert render_timeline(reader) == expected
+
+
+def test_preload_uses_the_disk_cache(xfl_dir, tmp_path):
+    cache_dir = tmp_path / "cache"
+
+    def cache_files():
+        return {path: path.stat().st_mtime_ns for path in cache_dir.rglob("*.pickle")}
+
+    with XflReader(xfl_dir, cache_dir=str(cache_dir)) as reader:
+        reader.preload(workers=1)
+        expected = render_timeline(reader)
+    saved = cache_files()
+    assert len(saved) == 2
+
+    # Entries are read, not written again
+    with XflReader(xfl_dir, cache_dir=str(cache_dir)) as reader:
+        reader.preload(workers=1)
+        assert render_timeline(reader) == expected
+    assert cache_files() == saved
@@ -0,0 +1,69 @@
+import xml.etree.ElementTree as ET
+
+from conftest import domshape, layer, write_xfl
+from xflsvg import Frame, SvgRenderer, XflReader
+
+HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def render(*frames):
+    with SvgRenderer() as renderer:
+        for frame in frames:
+            frame.render()
+    return renderer.compile(100, 100).getroot()
+
+
+def used_fill_colors(svg):
+    """Get the fill colors of the shapes that <use> elements point to."""
+    defs = {element.get("id"): element for element in svg.find("defs")}
+    colors = []
+    for use in svg.iter("use"):
+        shape = defs[use.get(HREF)[1:]]
+        colors.extend(path.get("fill") for path in shape.iter("path"))
+    return colors
+
+
+def shape_document(directory, color):
+    shape = domshape(color, "!0 0|200 0!200 0|0 200!0 200|0 0")
+    return write_xfl(directory, [layer((0, 1, shape))])
+
+
+def test_frames_from_two_readers_get_separate_defs(tmp_path):
+    colors = ["#FF0000", "#00FF00"]
+    frames = [
+        XflReader(shape_document(tmp_path / color[1:], color)).get_timeline()[0]
+        for color in colors
+    ]
+    # Both readers number their frames the same way
+    assert frames[0].identifier == frames[1].identifier
+
+    svg = render(*frames)
+    assert len(svg.find("defs")) == 2
+    assert used_fill_colors(svg) == colors
+
+
+def test_reader_and_standalone_frames_get_separate_defs(tmp_path):
+    red = XflReader(shape_document(tmp_path / "red", "#FF0000"))
+    green = XflReader(shape_document(tmp_path / "green", "#00FF00"))
+    reader_frame = red.get_timeline()[0]
+
+    # A standalone frame whose identifier happens to match a reader's frame
+    standalone = Frame(identifier=reader_frame.identifier)
+    standalone.add_child(green.get_timeline()[0])
+
+    svg = render(reader_frame, standalone)
+    assert used_fill_colors(svg) == ["#FF0000", "#00FF00"]
+
+
+def test_masks_get_separate_defs(xfl_dir):
+    frames = [XflReader(xfl_dir).get_timeline()[0] for _ in range(2)]
+    svg = render(*frames)
+    masks = svg.find("defs").findall("mask")
+    assert len({mask.get("id") for mask in masks}) == 2
+
+
+def test_same_frame_reuses_its_defs(tmp_path):
+    frame = XflReader(shape_document(tmp_path, "#FF0000")).get_timeline()[0]
+    svg = render(frame, frame)
+    assert len(svg.find("defs")) == 1
+    assert used_fill_colors(svg) == ["#FF0000", "#FF0000"]
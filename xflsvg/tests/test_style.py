@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+import xml.etree.ElementTree as ET
+
+from conftest import XMLNS, domshape, layer, write_xfl
+from test_files import render_timeline
+from xflsvg import XflReader
+from xflsvg.domshape import xfl_domshape_to_svg
+from xflsvg.domshape.style import StyleTable, parse_fill_style, parse_stroke_style
+
+
+def solid_color(color):
+    return ET.fromstring(f'<SolidColor {XMLNS} color="{color}"/>')
+
+
+def linear_gradient():
+    return ET.fromstring(
+        f'<LinearGradient {XMLNS} spreadMethod="reflect">'
+        '<matrix><Matrix a="0.05" d="0.05" tx="10" ty="20"/></matrix>'
+        '<GradientEntry color="#FF0000" ratio="0"/>'
+        '<GradientEntry color="#00FF00" alpha="0.5" ratio="1"/>'
+        "</LinearGradient>"
+    )
+
+
+def solid_stroke(weight):
+    return ET.fromstring(
+        f'<SolidStroke {XMLNS} scaleMode="normal" weight="{weight}">'
+        '<fill><SolidColor color="#112233"/></fill></SolidStroke>'
+    )
+
+
+def test_equal_styles_are_parsed_once():
+    styles = StyleTable()
+    attrib, extra_defs = styles.get_fill_style(solid_color("#FF0000"))
+    assert styles.get_fill_style(solid_color("#FF0000"))[0] is attrib
+    assert (dict(attrib), extra_defs) == parse_fill_style(solid_color("#FF0000"))
+
+    stroke = styles.get_stroke_style(solid_stroke("2"))
+    assert styles.get_stroke_style(solid_stroke("2")) is stroke
+    assert dict(stroke) == parse_stroke_style(solid_stroke("2"))
+    assert len(styles) == 2
+
+
+def test_least_recently_used_styles_are_evicted():
+    styles = StyleTable(max_entries=2)
+    red = styles.get_fill_style(solid_color("#FF0000"))[0]
+    green = styles.get_fill_style(solid_color("#00FF00"))[0]
+    styles.get_fill_style(solid_color("#FF0000"))
+    styles.get_fill_style(solid_color("#0000FF"))
+
+    assert len(styles) == 2
+    assert styles.get_fill_style(solid_color("#FF0000"))[0] is red
+    assert styles.get_fill_style(solid_color("#00FF00"))[0] is not green
+
+
+def test_modified_style_elements_are_parsed_again():
+    styles = StyleTable()
+    style = solid_color("#FF0000")
+    styles.get_fill_style(style)
+    style.set("color", "#00FF00")
+    assert styles.get_fill_style(style)[0]["fill"] == "#00FF00"
+
+
+def test_gradient_elements_are_not_shared():
+    styles = StyleTable()
+    attrib, extra_defs = styles.get_fill_style(linear_gradient())
+    ((gradient_id, gradient_element),) = extra_defs.items()
+    assert attrib["fill"] == f"url(#{gradient_id})"
+
+    gradient_element.set("id", "modified")
+    gradient_element.clear()
+    _, extra_defs = styles.get_fill_style(linear_gradient())
+    assert extra_defs[gradient_id] is not gradient_element
+    assert extra_defs[gradient_id].get("id") == gradient_id
+    assert len(extra_defs[gradient_id]) == 2
+
+
+def test_style_table_is_thread_safe():
+    styles = StyleTable(max_entries=8)
+    colors = [f"#{i:06X}" for i in range(32)]
+
+    def get_fills(offset):
+        return [
+            styles.get_fill_style(solid_color(colors[(offset + i) % 32]))[0]["fill"]
+            for i in range(500)
+        ]
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(get_fills, range(8)))
+
+    for offset, fills in enumerate(results):
+        assert fills == [colors[(offset + i) % 32] for i in range(500)]
+    assert len(styles) == 8
+
+
+def test_conversions_share_a_given_table():
+    shape = ET.fromstring(
+        domshape("#FF0000", "!0 0|20 0!20 0|0 20!0 20|0 0").replace(
+            "<DOMShape>", f"<DOMShape {XMLNS}>"
+        )
+    )
+    styles = StyleTable()
+    xfl_domshape_to_svg(shape, styles=styles)
+    xfl_domshape_to_svg(shape, styles=styles)
+    assert len(styles) == 1
+
+
+def test_readers_have_their_own_tables(tmp_path):
+    shape = domshape("#FF0000", "!0 0|200 0!200 0|0 200!0 200|0 0")
+    path = write_xfl(tmp_path, [layer((0, 1, shape))])
+    readers = [XflReader(path) for _ in range(2)]
+    assert readers[0].styles is not readers[1].styles
+
+    for reader in readers:
+        render_timeline(reader)
+    assert len(readers[0].styles) == len(readers[1].styles) == 1